@@ -2,12 +2,14 @@
 
 import math
 from enum import Enum
+from functools import lru_cache
 
 __all__ = ['GeoSatellite', 'geo_azimuth', 'geo_elevation', 'geo_closest']
 
 # Constants
 R_EARTH = 6378.137  # Radius of Earth in kilometers
 R_GEO = 35786       # Altitude of geostationary orbit in kilometers
+_R_RATIO = 1 + R_GEO / R_EARTH   # geostationary radius in Earth radii
 
 
 class GeoSatellite(Enum):
@@ -23,6 +25,16 @@ class GeoSatellite(Enum):
     USCA = -101.3   # Ligado SkyTerra-1 at time of writing
 
 
+_GEO_SATS = tuple(GeoSatellite)
+_GEO_SAT_NAMES = [sat.name for sat in _GEO_SATS]
+
+
+@lru_cache(maxsize=64)
+def _geo_candidates(exclude: 'tuple[str]') -> 'tuple[GeoSatellite]':
+    """Returns the satellites remaining after exclusions."""
+    return tuple(sat for sat in _GEO_SATS if sat.name not in exclude)
+
+
 def _validate(sat_lon: float, es_lat: float, es_lon: float, precision: int):
     if any(not isinstance(lon, (float, int)) or lon < -180 or lon > 180
            for lon in (sat_lon, es_lon)):
@@ -70,11 +82,10 @@ def geo_elevation(sat_lon: float, es_lat: float, es_lon: float, precision: int =
         The elevation to the satellite relative to the earth station in degrees.
     """
     _validate(sat_lon, es_lat, es_lon, precision)
-    d_lon = math.radians(es_lon - sat_lon)
-    es_lat_rad = math.radians(es_lat)
-    r1 = 1 + R_GEO / R_EARTH
-    v1 = r1 * math.cos(es_lat_rad) * math.cos(d_lon) - 1
-    v2 = r1 * math.sqrt(1 - math.cos(es_lat_rad)**2 * math.cos(d_lon)**2)
+    cos_lat = math.cos(math.radians(es_lat))
+    cos_lon = math.cos(math.radians(es_lon - sat_lon))
+    v1 = _R_RATIO * cos_lat * cos_lon - 1
+    v2 = _R_RATIO * math.sqrt(1 - cos_lat**2 * cos_lon**2)
     es_el = math.degrees(math.atan(v1/v2))
     result = round(es_el, precision)
     return result if precision else int(result)
@@ -91,21 +102,14 @@ def geo_closest(es_lat: float, es_lon: float, exclude: 'list[str]' = []) -> 'Geo
     Returns:
         `GeoSatellite` closest to the earth station.
     """
-    sats = [e for e in GeoSatellite]
-    sat_names = [e.name for e in GeoSatellite]
     if not isinstance(es_lat, (float, int)) or es_lat < -90 or es_lat > 90:
         raise ValueError('Invalid latitude must be in range +/- 90')
     if not isinstance(es_lon, (float, int)) or es_lon < -180 or es_lon > 180:
         raise ValueError('Invalid longitude must be in range +/- 180')
-    if not isinstance(exclude, list) or not all(x in sat_names for x in exclude):
-        raise ValueError(f'Invalid exclusion name must be in ({sat_names})')
-    if isinstance(exclude, list) and all(isinstance(x, str) for x in exclude):
-        rem = []
-        for i, sat in enumerate(sats):
-            if sat.name in exclude:
-                rem.append(i)
-        for i in rem:
-            del sats[i]
+    if (not isinstance(exclude, list) or
+        not all(x in _GEO_SAT_NAMES for x in exclude)):
+        raise ValueError(f'Invalid exclusion name must be in ({_GEO_SAT_NAMES})')
+    sats = _geo_candidates(tuple(exclude))
     closest = min(sats, key=lambda x:abs(x.value - es_lon))
     if (GeoSatellite.AORW.name not in exclude and
         closest == GeoSatellite.AORW):
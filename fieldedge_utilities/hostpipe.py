@@ -184,7 +184,7 @@ def host_get_response(command: str,
             break
         if _vlog():
             _log.debug('%s read iteration %d', pipelog, filepass)
-        lines = open(pipelog, 'r').readlines()
+        lines = _read_pipelog(pipelog)
         for line in reversed(lines):
             if (not test_mode and
                 command_time is not None and
@@ -225,6 +225,12 @@ def host_get_response(command: str,
     return '\n'.join(response)
 
 
+def _read_pipelog(pipelog: str) -> 'list[str]':
+    """Returns the lines of the hostpipe log."""
+    with open(pipelog, 'r') as file:
+        return file.readlines()
+
+
 def _maintain_pipelog(pipelog: str,
                       max_file_size: int = MAX_FILE_SIZE,
                       test_mode: bool = False,
@@ -240,7 +246,7 @@ def _maintain_pipelog(pipelog: str,
         raise FileNotFoundError(f'Could not find {pipelog}')
     to_delete = []
     if os.path.getsize(pipelog) > max_file_size:
-        lines = open(pipelog, 'r').readlines()
+        lines = _read_pipelog(pipelog)
         while os.path.getsize(pipelog) > max_file_size:
             for line in lines:
                 if RES_TAG in line:
@@ -7,6 +7,7 @@ import ipaddress
 import json
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 import ifaddr
 
@@ -101,6 +102,13 @@ def is_valid_ip(ip_address: str, ipv4_only: bool = True) -> bool:
         True if it is a valid IP address.
 
     """
+    if isinstance(ip_address, str):
+        return _is_valid_ip(ip_address, ipv4_only)
+    return _is_valid_ip.__wrapped__(ip_address, ipv4_only)
+
+
+@lru_cache(maxsize=256)
+def _is_valid_ip(ip_address: str, ipv4_only: bool) -> bool:
     try:
         ip_address = ipaddress.ip_address(ip_address)
         assert (isinstance(ip_address, ipaddress.IPv4Address) or
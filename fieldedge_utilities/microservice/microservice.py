@@ -30,6 +30,10 @@ __all__ = ['Microservice']
 
 _log = logging.getLogger(__name__)
 
+#: property_cache tags of the derived property lists, dropped on refresh
+_PROPERTY_LISTS = ('properties', 'isc_properties', 'properties_by_type',
+                   'isc_properties_by_type')
+
 
 class DictTrigger(dict):
     """A modified dictionary that monitors edits and executes a callback."""
@@ -170,14 +174,14 @@ class Microservice(ABC):
     def properties(self) -> 'list[str]':
         """A list of public properties of the class."""
         cached = self.property_cache.get_cached('properties')
-        if cached:
+        if cached is not None:
             return cached
         return self._refresh_properties()
 
     def _refresh_properties(self) -> 'list[str]':
         """Refreshes the class properties."""
-        self.property_cache.remove('properties')
-        self.property_cache.remove('isc_properties')
+        for tag in _PROPERTY_LISTS:
+            self.property_cache.remove(tag)
         ignore = self._hidden_properties
         properties = get_class_properties(self.__class__, ignore)
         for tag, feature in self.features.items():
@@ -220,7 +224,12 @@ class Microservice(ABC):
     @property
     def properties_by_type(self) -> 'dict[str, list[str]]':
         """Public properties lists of the class tagged `info` or `config`."""
-        return self._categorized(self.properties)
+        cached = self.property_cache.get_cached('properties_by_type')
+        if cached is not None:
+            return cached
+        categorized = self._categorized(self.properties)
+        self.property_cache.cache(categorized, 'properties_by_type', None)
+        return categorized
 
     def property_hide(self, prop_name: str):
         """Hides a property so it will not list in `properties`."""
@@ -240,24 +249,32 @@ class Microservice(ABC):
     def isc_properties(self) -> 'list[str]':
         """ISC exposed properties."""
         cached = self.property_cache.get_cached('isc_properties')
-        if cached:
+        if cached is not None:
             return cached
         return self._refresh_isc_properties()
 
     def _refresh_isc_properties(self) -> 'list[str]':
         """Refreshes the cached ISC properties list."""
-        ignore = self._hidden_properties
-        ignore.extend(p for p in self._hidden_isc_properties
-                      if p not in self._hidden_properties)
+        self.property_cache.remove('isc_properties_by_type')
+        ignore = set(self._hidden_properties)
+        ignore.update(self._hidden_isc_properties)
         tag = self.tag if self._isc_tags else None
-        isc_properties = [tag_class_property(prop, tag)
-                          for prop in self.properties if prop not in ignore]
+        isc_properties = []
+        for prop in self.properties:
+            if prop in ignore:
+                continue
+            isc_prop = tag_class_property(prop, tag)
+            if isc_prop not in ignore:
+                isc_properties.append(isc_prop)
         self.property_cache.cache(isc_properties, 'isc_properties', None)
         return isc_properties
 
     @property
     def isc_properties_by_type(self) -> 'dict[str, list[str]]':
         """ISC exposed properties tagged `info` or `config`."""
+        cached = self.property_cache.get_cached('isc_properties_by_type')
+        if cached is not None:
+            return cached
         # subfunction
         def feature_prop(prop) -> 'tuple[object, str]':
             fprop, ftag = untag_class_property(prop, True, True)
@@ -283,6 +300,7 @@ class Microservice(ABC):
                 else:
                     obj, prop = feature_prop(isc_prop)
             self._categorize_prop(obj, prop, categorized, isc_prop)
+        self.property_cache.cache(categorized, 'isc_properties_by_type', None)
         return categorized
 
     def isc_get_property(self, isc_property: str) -> Any:
@@ -381,7 +399,7 @@ class Microservice(ABC):
         subtopic = 'rollcall/response'
         if 'uid' not in message:
             _log.warning('Rollcall request missing unique ID')
-        requestor = topic.split('/')[1]
+        requestor = topic.split('/', 2)[1]
         response = { 'uid': message.get('uid', None), 'requestor': requestor }
         for isc_prop in self._rollcall_properties:
             if isc_prop in self.isc_properties:
@@ -450,7 +468,7 @@ class Microservice(ABC):
             True if handled by a defined method.
         
         """
-        target = topic.split('/')[1]
+        target = topic.split('/', 2)[1]
         if (target == self.tag and '/request/' not in topic):
             if _vlog(self.tag):
                 _log.debug('Ignoring own response/event (%s)', topic)
@@ -25,24 +25,46 @@ class CachedProperty:
     """A property value with a capture timestamp and lifetime.
     
     Setting `lifetime` to `None` makes the cached value always valid.
+    Age is measured on the monotonic clock so wall clock changes (e.g. NTP or
+    GNSS time sync) do not expire or extend cached values.
     
     """
     value: Any
     name: 'str|None' = None
     lifetime: 'float|None' = 1.0
     cache_time: float = field(default_factory=time.time)
+    _cached_ns: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        offset_ns = int((time.time() - self.cache_time) * 1e9)
+        self._cached_ns = time.monotonic_ns() - offset_ns
 
     @property
     def age(self) -> float:
         """The age of the cached value in seconds."""
-        return round(time.time() - self.cache_time, 3)
+        return round((time.monotonic_ns() - self._cached_ns) / 1e9, 3)
+
+    @property
+    def expires_at(self) -> 'float|None':
+        """The unix timestamp when the value expires, `None` if unlimited.
+        
+        Derived from the monotonic age, consistent with `is_valid`, so a wall
+        clock change after caching does not skew the result.
+        
+        """
+        lifetime = self.lifetime
+        if lifetime is None:
+            return None
+        age = (time.monotonic_ns() - self._cached_ns) / 1e9
+        return time.time() + lifetime - age
 
     @property
     def is_valid(self) -> bool:
         """Returns True if the age is within the lifetime."""
-        if self.lifetime is None:
+        lifetime = self.lifetime
+        if lifetime is None:
             return True
-        return self.age <= self.lifetime
+        return time.monotonic_ns() - self._cached_ns <= lifetime * 1e9
 
 
 class PropertyCache:
@@ -95,6 +117,22 @@ class PropertyCache:
             else:
                 _log.debug('%s was not cached', tag)
 
+    def expiry_at(self, tag: str) -> 'float|None':
+        """Returns the unix timestamp when a cached value expires.
+        
+        Args:
+            tag: The property name in the cache.
+        
+        Returns:
+            The expiry time, or `None` if the tag is not cached or its lifetime
+                is unlimited.
+            
+        """
+        cached = self._cache.get(tag)
+        if cached is None:
+            return None
+        return cached.expires_at
+
     def get_cached(self, tag: str) -> Any:
         """Retrieves the cached property value if valid.
         
@@ -107,11 +145,11 @@ class PropertyCache:
             The cached property value, or `None` if the tag is not found.
             
         """
-        if tag not in self._cache:
+        cached = self._cache.get(tag)
+        if cached is None:
             if _vlog():
                 _log.debug('%s not cached', tag)
             return None
-        cached = self._cache[tag]
         if cached.is_valid:
             if _vlog():
                 _log.debug('Returning %s value %s (age %.3f seconds)',
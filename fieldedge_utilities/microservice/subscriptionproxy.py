@@ -3,6 +3,8 @@
 import logging
 from typing import Callable
 
+from paho.mqtt.client import topic_matches_sub
+
 from fieldedge_utilities.mqtt import MqttClient
 
 __all__ = ['SubscriptionProxy']
@@ -28,7 +30,7 @@ class SubscriptionProxy:
         if not isinstance(mqtt_client, MqttClient):
             raise ValueError('mqtt_client must be a valid MqttClient instance')
         self._mqttc: MqttClient = mqtt_client
-        self._subscriptions: dict = {}
+        self._subscriptions: 'dict[str, dict[str, Callable]]' = {}
 
     def proxy_add(self,
                   module: str,
@@ -45,17 +47,12 @@ class SubscriptionProxy:
             qos: The MQTT QoS 0 = max once, 1 = at least once, 2 = exactly once
             
         """
-        for mod, topics in self._subscriptions.items():
-            for top in topics:
-                if top == topic and mod == module:
-                    _log.warning('Topic %s already subscribed by %s',
-                                 topic, mod)
-                    return False
-        if module not in self._subscriptions:
-            self._subscriptions[module] = {}
+        if module in self._subscriptions.get(topic, {}):
+            _log.warning('Topic %s already subscribed by %s', topic, module)
+            return False
         try:
             self._mqttc.subscribe(topic, qos)
-            self._subscriptions[module][topic] = callback
+            self._subscriptions.setdefault(topic, {})[module] = callback
             return True
         except Exception as err:
             _log.error('Failed to proxy subscribe: %s', err)
@@ -63,19 +60,13 @@ class SubscriptionProxy:
 
     def proxy_del(self, module: str, topic: str) -> bool:
         """Removes a subscription proxy."""
-        modules_subscribed = []
-        for mod, topics in self._subscriptions.items():
-            for top in topics:
-                if top == topic:
-                    modules_subscribed.append(mod)
-        if (module in self._subscriptions and
-            topic in self._subscriptions[module]):
+        subscribers = self._subscriptions.get(topic, {})
+        if module in subscribers:
             # found it - ok to remove
             try:
-                del self._subscriptions[module][topic]
-                if not self._subscriptions[module]:
-                    del self._subscriptions[module]
-                if len(modules_subscribed) == 1:
+                del subscribers[module]
+                if not subscribers:
+                    del self._subscriptions[topic]
                     self._mqttc.unsubscribe(topic)
                 return True
             except Exception as err:
@@ -83,9 +74,24 @@ class SubscriptionProxy:
                 return False
         return True
 
+    def _callbacks(self, topic: str) -> 'dict[str, Callable]':
+        """Returns one callback per module with a matching subscription.
+        
+        An exact topic subscription takes precedence over a wildcard one for
+        the same module, so a module is never called twice for one message.
+        
+        """
+        callbacks = dict(self._subscriptions.get(topic, {}))
+        for sub, subscribers in self._subscriptions.items():
+            if sub == topic or ('#' not in sub and '+' not in sub):
+                continue
+            if topic_matches_sub(sub, topic):
+                for module, callback in subscribers.items():
+                    callbacks.setdefault(module, callback)
+        return callbacks
+
     def proxy_pub(self, topic: str, message: dict) -> None:
         """Publishes via a parent MQTT publish function."""
-        for topics in self._subscriptions.values():
-            if topic in topics:
-                if callable(topics[topic]):
-                    topics[topic](topic, message)
+        for callback in self._callbacks(topic).values():
+            if callable(callback):
+                callback(topic, message)
@@ -1,17 +1,30 @@
 """Helper functions for dealing with FieldEdge classes and interservice comms.
+
+If the optional `orjson` package is installed it will be used by `json_bytes`.
+
 """
 import inspect
 import itertools
 import json
 import logging
-import re
+import math
+import sys
+from functools import lru_cache
+from typing import Any, Callable
+from weakref import WeakKeyDictionary, finalize
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from fieldedge_utilities.logger import verbose_logging
 
 __all__ = ['camel_case', 'snake_case', 'get_class_tag',
            'camel_to_snake', 'snake_to_camel',
            'get_class_properties', 'get_instance_properties_values',
-           'json_compatible', 'hasattr_static',
+           'json_compatible', 'json_compatible_cached', 'json_bytes',
+           'hasattr_static',
            'property_is_read_only', 'property_is_async', 'tag_class_properties',
            'tag_class_property', 'untag_class_property', 'tag_merge',
            'equivalent_attributes', 'READ_ONLY', 'READ_WRITE']
@@ -19,6 +32,15 @@ __all__ = ['camel_case', 'snake_case', 'get_class_tag',
 READ_ONLY = 'info'
 READ_WRITE = 'config'
 
+_JSON_ATOMIC = (str, int, float, bool, type(None))
+_JSON_NATIVE = frozenset(_JSON_ATOMIC)   #: exact types left as-is
+_JSON_CACHE: 'dict[int, dict]' = {}   #: by id(), evicted by finalize
+_CLASS_PROPS: 'WeakKeyDictionary[type, tuple[str]]' = WeakKeyDictionary()
+_PROPERTY_NAMES: 'WeakKeyDictionary[type, tuple[str]]' = WeakKeyDictionary()
+_TAGGED_PROPS: 'WeakKeyDictionary[type, dict]' = WeakKeyDictionary()
+_ASCII_UPPER = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+_ASCII_LOWER = frozenset('abcdefghijklmnopqrstuvwxyz')
+
 _log = logging.getLogger(__name__)
 
 
@@ -78,7 +100,15 @@ def snake_case(original: str,
         raise ValueError('Invalid string input')
     if original.isupper() and skip_caps:
         return original
-    snake = re.compile(r'(?<!^)(?=[A-Z])').sub('_', original).lower()
+    if original.islower() and '__' not in original:
+        return original   # already snake_case
+    return _snake_case(original, skip_pascal)
+
+
+@lru_cache(maxsize=4096)
+def _snake_case(original: str, skip_pascal: bool) -> str:
+    """Memoized conversion for `snake_case` (property names repeat often)."""
+    snake = _snake_words(original).lower()
     if '__' in snake:
         words = snake.split('__')
         snake = '_'.join(f'{word.replace("_", "")}' for word in words)
@@ -107,14 +137,54 @@ def camel_case(original: str,
         raise ValueError('Invalid string input')
     if original.isupper() and skip_caps:
         return original
+    if '_' not in original and original.islower():
+        return original   # single word, nothing to convert
+    return _camel_case(original, skip_pascal)
+
+
+@lru_cache(maxsize=4096)
+def _camel_case(original: str, skip_pascal: bool) -> str:
+    """Memoized conversion for `camel_case` (property names repeat often)."""
     words = original.split('_')
     if len(words) == 1:
-        regex = '.+?(?:(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|$)'
-        matches = re.finditer(regex, original)
-        words = [m.group(0) for m in matches]
+        words = _camel_words(original)
     if skip_pascal and all(word.title() == word for word in words):
         return original
-    return words[0].lower() + ''.join(w.title() for w in words[1:])
+    return words[0].lower() + ''.join([w.title() for w in words[1:]])
+
+
+def _snake_words(original: str) -> str:
+    """Inserts an underscore before each capital letter except the first."""
+    chars = [original[0]]
+    for ch in original[1:]:
+        if ch in _ASCII_UPPER:
+            chars.append('_')
+        chars.append(ch)
+    return ''.join(chars)
+
+
+def _camel_words(original: str) -> 'list[str]':
+    """Splits a camelCase/PascalCase string into its words.
+    
+    A word ends before a capital following a lowercase letter, or before the
+    last capital of an acronym followed by a lowercase letter.
+    
+    """
+    words = []
+    start = 0
+    last = len(original) - 1
+    for i in range(1, last + 1):
+        prev = original[i - 1]
+        ch = original[i]
+        if ch not in _ASCII_UPPER:
+            continue
+        if (prev in _ASCII_LOWER or
+            (prev in _ASCII_UPPER and i < last and
+             original[i + 1] in _ASCII_LOWER)):
+            words.append(original[start:i])
+            start = i
+    words.append(original[start:])
+    return words
 
 
 def pascal_case(original: str, skip_caps: bool = False) -> str:
@@ -152,12 +222,34 @@ def get_class_properties(cls: type, ignore: 'list[str]' = None) -> 'list[str]':
         ValueError if `cls` does not have a `dir()` method or is not a `type`.
         
     """
-    if not dir(cls):
-        raise ValueError('Invalid cls_instance - must have dir() method')
-    if isinstance(cls, type) and '__slots__' not in dir(cls):
-        _log.warning('No __slots__: attributes in __init__ will be missed')
     if not isinstance(ignore, list):
         ignore = []
+    if isinstance(cls, type):
+        if not hasattr(cls, '__slots__'):
+            _log.warning('No __slots__: attributes in __init__ will be missed')
+        if type(cls).__dir__ is type.__dir__:
+            return [attr for attr in _class_properties(cls)
+                    if attr not in ignore]
+        # a metaclass `__dir__` (e.g. Enum) defines what is exposed
+    elif type(cls).__dir__ is object.__dir__:
+        # class part is cached and sorted, only check instance attributes
+        class_props = _class_properties(type(cls))
+        added = set()
+        removed = set()
+        for attr in getattr(cls, '__dict__', ()):
+            if attr.startswith('_') or attr.isupper():
+                continue
+            if callable(inspect.getattr_static(cls, attr)):
+                removed.add(attr)
+            elif attr not in class_props:
+                added.add(attr)
+        props = [attr for attr in class_props
+                 if attr not in ignore and attr not in removed]
+        if added:
+            props = sorted(props + [a for a in added if a not in ignore])
+        return props
+    if not dir(cls):
+        raise ValueError('Invalid cls_instance - must have dir() method')
     attrs = [attr for attr in dir(cls)
              if not attr.startswith(('_',)) and
              attr not in ignore and
@@ -166,6 +258,33 @@ def get_class_properties(cls: type, ignore: 'list[str]' = None) -> 'list[str]':
     return attrs
 
 
+def _class_properties(cls: type) -> 'tuple[str]':
+    """Returns the exposed property names of a class, cached per class.
+    
+    Walks the MRO once using each class `__dict__` so that inherited
+    properties are included, with the nearest definition taking precedence.
+    The cache is keyed weakly so user classes are neither modified nor kept
+    alive by it.
+    
+    """
+    cached = _CLASS_PROPS.get(cls)
+    if cached is not None:
+        return cached
+    seen = set()
+    attrs = []
+    for klass in cls.__mro__:
+        for attr, value in klass.__dict__.items():
+            if attr in seen:
+                continue
+            seen.add(attr)
+            if (attr.startswith('_') or attr.isupper() or callable(value)):
+                continue
+            attrs.append(attr)
+    cached = tuple(sorted(attrs))
+    _CLASS_PROPS[cls] = cached
+    return cached
+
+
 def get_instance_properties_values(instance: object) -> dict:
     """Returns the instance properties and values."""
     props_list = get_class_properties(instance)
@@ -195,48 +314,202 @@ def json_compatible(obj: object,
             `json.dumps`.
 
     """
-    res = obj
-    if camel_keys:
-        if isinstance(obj, dict):
-            res = {}
-            for key, val in obj.items():
-                if ((isinstance(key, str) and key.isupper() and skip_caps) or
-                    not isinstance(key, str)):
-                    # no change
-                    camel_key = key
-                else:
-                    camel_key = camel_case(str(key))
-                if camel_key != key and verbose_logging('tags'):
-                    _log.debug('Changed %s to %s', key, camel_key)
-                res[camel_key] = json_compatible(val, camel_keys, skip_caps)
-        elif isinstance(obj, list):
-            res = [json_compatible(i) for i in obj]
-    try:
-        json.dumps(res)
-        return res
-    except TypeError:
+    return _json_compatible(obj, camel_keys, skip_caps, {})
+
+
+def json_compatible_cached(obj: object,
+                           camel_keys: bool = True,
+                           skip_caps: bool = True) -> dict:
+    """Returns a cached `json_compatible` representation of an object.
+    
+    Intended for immutable objects (e.g. frozen dataclasses) that are
+    serialized repeatedly. The result is cached against the identity of the
+    object until it is garbage collected, so later changes to a mutable object
+    are not reflected. Each call returns a fresh copy of the cached containers.
+    Objects that cannot be weakly referenced are not cached.
+    
+    Args:
+        obj: The source object.
+        camel_keys: Flag indicating whether to convert all nested dictionary
+            keys to `camelCase`.
+        skip_caps: Preserves `CAPITAL_CASE` keys if True
+    
+    Returns:
+        A dictionary with nested arrays, dictionaries and other compatible with
+            `json.dumps`.
+    
+    """
+    if isinstance(obj, _JSON_ATOMIC):
+        return obj
+    key = (camel_keys, skip_caps)
+    obj_id = id(obj)
+    cached = _JSON_CACHE.get(obj_id)
+    if cached is None:
         try:
-            if callable(res):
-                res = f'<function:{res.__name__}>'
-            elif isinstance(res, list):
-                res = [json_compatible(v, camel_keys, skip_caps)
-                       for v in res]
-            elif hasattr(res, '__dict__'):
-                res = json_compatible(get_instance_properties_values(res),
-                                      camel_keys,
-                                      skip_caps)
-            elif isinstance(res, dict):
-                res = {k:json_compatible(v, camel_keys, skip_caps)
-                       for k, v in res.items()}
-            elif hasattr(res, '__slots__'):
-                res = {s: json_compatible(getattr(res, s, None))
-                       for s in res.__slots__}
-            else:
-                res = '<non-serializable>'
-            return res
-        except Exception as exc:
-            _log.error(exc)
-            raise exc
+            finalize(obj, _JSON_CACHE.pop, obj_id, None)
+        except TypeError:
+            return json_compatible(obj, camel_keys, skip_caps)
+        cached = _JSON_CACHE[obj_id] = {}
+    if key not in cached:
+        cached[key] = json_compatible(obj, camel_keys, skip_caps)
+    return _json_copy(cached[key])
+
+
+def _json_copy(obj: Any) -> Any:
+    """Copies the dictionaries and lists of `json_compatible` output."""
+    if type(obj) not in (dict, list):
+        return obj
+    root = [obj]
+    stack = [(root, 0, obj)]
+    while stack:
+        parent, key, value = stack.pop()
+        if type(value) is dict:
+            value = dict(value)
+            stack.extend((value, k, v) for k, v in value.items()
+                         if type(v) in (dict, list))
+        else:
+            value = list(value)
+            stack.extend((value, i, v) for i, v in enumerate(value)
+                         if type(v) in (dict, list))
+        parent[key] = value
+    return root[0]
+
+
+def json_bytes(obj: object,
+               camel_keys: bool = True,
+               skip_caps: bool = True) -> bytes:
+    """Returns the UTF-8 JSON encoding of an object.
+    
+    Uses `orjson` if installed, otherwise `json.dumps` with compact separators
+    so that both produce the same bytes. Non-finite floats (NaN, Infinity) are
+    encoded as `null` either way, and integers wider than 64 bits that
+    `orjson` rejects are encoded by `json.dumps`.
+    
+    Args:
+        obj: The source object.
+        camel_keys: Flag indicating whether to convert all nested dictionary
+            keys to `camelCase`.
+        skip_caps: Preserves `CAPITAL_CASE` keys if True
+    
+    Returns:
+        The JSON encoded bytes.
+    
+    """
+    obj = json_compatible(obj, camel_keys, skip_caps)
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass   # e.g. integer exceeds 64-bit range
+    try:
+        return _json_dumps(obj)
+    except ValueError:   # non-finite float, encoded as null like orjson
+        return _json_dumps(_json_finite(obj))
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj,
+                      separators=(',', ':'),
+                      ensure_ascii=False,
+                      allow_nan=False).encode()
+
+
+def _json_finite(obj: Any) -> Any:
+    """Replaces non-finite floats in `json_compatible` output with `None`."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _json_finite(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_json_finite(v) for v in obj]
+    return obj
+
+
+def _json_compatible(obj: object,
+                     camel_keys: bool,
+                     skip_caps: bool,
+                     memo: 'dict[int, tuple[object, Any]]') -> Any:
+    """Worker for `json_compatible` using an explicit stack.
+    
+    Conversion is dispatched on the exact type of each value (see
+    `_json_handler`). Handlers return the converted container along with the
+    `(container, key, value)` children still to be converted, so nesting depth
+    is not limited by the recursion limit.
+    `memo` maps `id()` of containers/objects already converted during a single
+    call so that shared references are only walked once. The source object is
+    held alongside the result so its `id()` cannot be reused within the call.
+    
+    """
+    root = [obj]
+    stack = [(root, 0, obj)]
+    while stack:
+        parent, key, value = stack.pop()
+        handler = _JSON_DISPATCH.get(type(value)) or _json_handler(type(value))
+        if handler is _json_atomic:
+            continue   # already in place
+        value_id = id(value)
+        if value_id in memo:
+            parent[key] = memo[value_id][1]
+            continue
+        res, children = handler(value, camel_keys, skip_caps)
+        memo[value_id] = (value, res)
+        parent[key] = res
+        stack.extend(children)
+    return root[0]
+
+
+def _json_atomic(obj, *_) -> Any:
+    return obj
+
+
+def _json_dict(obj: dict, camel_keys: bool, skip_caps: bool) -> tuple:
+    res = {}
+    for key, val in obj.items():
+        if (not camel_keys or not isinstance(key, str) or
+            (key.isupper() and skip_caps)):
+            # no change
+            camel_key = key
+        else:
+            camel_key = camel_case(key)
+        if camel_key != key and verbose_logging('tags'):
+            _log.debug('Changed %s to %s', key, camel_key)
+        res[camel_key] = val
+    return res, [(res, k, v) for k, v in res.items()
+                 if type(v) not in _JSON_NATIVE]
+
+
+def _json_list(obj: 'list|tuple', *_) -> tuple:
+    res = list(obj)
+    return res, [(res, i, v) for i, v in enumerate(res)
+                 if type(v) not in _JSON_NATIVE]
+
+
+def _json_object(obj: object, camel_keys: bool, skip_caps: bool) -> tuple:
+    if callable(obj):
+        return f'<function:{obj.__name__}>', ()
+    if hasattr(obj, '__dict__'):
+        return _json_dict(get_instance_properties_values(obj),
+                          camel_keys,
+                          skip_caps)
+    if hasattr(obj, '__slots__'):
+        res = {s: getattr(obj, s, None) for s in _slot_names(type(obj))}
+        return res, [(res, s, v) for s, v in res.items()
+                     if type(v) not in _JSON_NATIVE]
+    return '<non-serializable>', ()
+
+
+#: Handlers by exact type, other types are resolved by `_json_handler`.
+_JSON_DISPATCH = {t: _json_atomic for t in _JSON_ATOMIC}
+_JSON_DISPATCH.update({dict: _json_dict, list: _json_list, tuple: _json_list})
+
+
+@lru_cache(maxsize=256)
+def _json_handler(cls: type) -> Callable:
+    """Resolves the conversion handler for a type via its MRO."""
+    for base in cls.__mro__:
+        if base in _JSON_DISPATCH:
+            return _JSON_DISPATCH[base]
+    return _json_object
 
 
 def hasattr_static(obj: object, attr: str) -> bool:
@@ -323,22 +596,60 @@ def tag_class_properties(cls: type,
     #     _log.debug('Processing for microservice')
     if auto_tag and not tag:
         tag = get_class_tag(cls)
-    class_props = get_class_properties(cls, ignore)
+    if isinstance(ignore, str):
+        ignore = (ignore,)
+    ignore = tuple(ignore) if ignore else ()
+    if not isinstance(cls, type):
+        # instance attributes may vary so are not cached
+        return _tag_class_properties(cls, tag, use_json, categorize, ignore)
+    tagged = _tag_class_properties_cached(cls, tag, use_json, categorize, ignore)
+    if isinstance(tagged, dict):
+        return {category: list(props) for category, props in tagged.items()}
+    return list(tagged)
+
+
+def _tag_class_properties(cls: type,
+                          tag: 'str|None',
+                          use_json: bool,
+                          categorize: bool,
+                          ignore: 'tuple[str]',
+                          ) -> 'list|dict':
+    """Builds the tagged properties for `tag_class_properties`."""
+    class_props = get_class_properties(cls, list(ignore))
     if not categorize:
         return [tag_class_property(prop, tag, use_json) for prop in class_props]
     result = {}
     for prop in class_props:
-        if property_is_read_only(cls, prop):
-            if READ_ONLY not in result:
-                result[READ_ONLY] = []
-            result[READ_ONLY].append(tag_class_property(prop, tag, use_json))
+        # single static lookup, equivalent to `property_is_read_only`
+        attr = inspect.getattr_static(cls, prop)
+        if getattr(attr, 'fset', False) is None:
+            category = READ_ONLY
         else:
-            if READ_WRITE not in result:
-                result[READ_WRITE] = []
-            result[READ_WRITE].append(tag_class_property(prop, tag, use_json))
+            category = READ_WRITE
+        result.setdefault(category, []).append(
+            tag_class_property(prop, tag, use_json))
     return result
 
 
+def _tag_class_properties_cached(cls: type,
+                                 tag: 'str|None',
+                                 use_json: bool,
+                                 categorize: bool,
+                                 ignore: 'tuple[str]',
+                                 ) -> 'list|dict':
+    """Returns `_tag_class_properties` for a class, cached weakly per class.
+    
+    Class layout is fixed after definition so tagged results can be reused.
+    
+    """
+    cached: dict = _TAGGED_PROPS.setdefault(cls, {})
+    key = (tag, use_json, categorize, ignore)
+    if key not in cached:
+        cached[key] = _tag_class_properties(cls, tag, use_json, categorize,
+                                            ignore)
+    return cached[key]
+
+
 def tag_class_property(prop: str,
                        tag_or_cls: 'str|type' = None,
                        use_json: bool = True) -> str:
@@ -353,11 +664,13 @@ def tag_class_property(prop: str,
         else:
             raise ValueError('tag_or_cls must be a string or class type')
         tagged = f'{tag.lower()}_{prop}'
+    # interned since tagged names are reused as dict keys and topic parts
     if use_json:
-        return camel_case(f'{tagged}')
-    return f'{tag}_{prop}'
+        return sys.intern(camel_case(tagged))
+    return sys.intern(f'{tag}_{prop}')
 
 
+@lru_cache(maxsize=4096)
 def untag_class_property(property_name: str,
                          is_tagged: bool = True,
                          include_tag: bool = False,
@@ -366,6 +679,7 @@ def untag_class_property(property_name: str,
     
     Expects a JSON-format tagged value e.g. `modemUniqueId` would return
     `(unique_id, modem)` where it assumes the first word is the tag.
+    Results are memoized since tagged names come from a small fixed set.
 
     Args:
         property_name: The property name, assumes using camelCase.
@@ -444,6 +758,11 @@ def equivalent_attributes(ref: object,
                           ) -> bool:
     """Confirms attribute equivalence between objects of the same type.
     
+    Objects of exactly the same type compare their instance attributes held in
+    `__dict__` and/or `__slots__` plus their property values, since any other
+    class-level value is shared. If `other` is a subclass instance, all
+    non-dunder attributes including class-level values are compared.
+    
     Args:
         ref: The reference object being compared to.
         other: The object comparing against the reference.
@@ -455,26 +774,89 @@ def equivalent_attributes(ref: object,
     """
     if not isinstance(other, type(ref)):
         return False
-    if not hasattr(ref, '__dict__') or not hasattr(other, '__dict__'):
+    if not hasattr(ref, '__dict__') and not hasattr(ref, '__slots__'):
         return ref == other
-    if not isinstance(exclude, list):
-        exclude = []
+    excluded = set(exclude) if exclude else set()
     if dbg:
         dbg += '.'
-    for attr in dir(ref):
-        if attr.startswith('__') or attr in exclude:
+    if type(ref) is type(other):
+        ref_vars = _attribute_values(ref, excluded)
+        other_vars = _attribute_values(other, excluded)
+    else:
+        ref_vars = _dir_values(ref, excluded)
+        other_vars = _dir_values(other, excluded)
+    if ref_vars == other_vars:
+        return True   # single C-level compare when all values are equal
+    for attr, ref_val in ref_vars.items():
+        if callable(ref_val):
             continue
-        if not hasattr(other, attr):
+        if attr not in other_vars:
             _log.debug('Other missing %s%s', dbg, attr)
             return False
-        ref_val = getattr(ref, attr)
-        if callable(ref_val):
+        other_val = other_vars[attr]
+        if ref_val is other_val:
             continue
-        other_val = getattr(other, attr)
-        if any(hasattr(ref_val, a) for a in ['__dict__', '__slots__']):
+        if hasattr(ref_val, '__dict__') or hasattr(ref_val, '__slots__'):
             if not equivalent_attributes(ref_val, other_val, dbg=attr):
                 return False
         elif ref_val != other_val:
             _log.debug('%s%s mismatch', dbg, attr)
             return False
     return True
+
+
+def _attribute_values(obj: object, excluded: 'set[str]') -> dict:
+    """Returns the instance attribute and property values of an object."""
+    values = {}
+    if hasattr(obj, '__dict__'):
+        values.update(vars(obj))
+    for slot in _slot_names(type(obj)):
+        if slot in values:
+            continue
+        try:
+            values[slot] = getattr(obj, slot)
+        except AttributeError:   # unassigned slot
+            pass
+    for prop in _property_names(type(obj)):
+        if prop not in values and prop not in excluded:
+            values[prop] = getattr(obj, prop)
+    for attr in excluded.intersection(values):
+        del values[attr]
+    return values
+
+
+def _dir_values(obj: object, excluded: 'set[str]') -> dict:
+    """Returns all non-dunder attribute values of an object including class."""
+    values = {}
+    for attr in dir(obj):
+        if attr.startswith('__') or attr in excluded:
+            continue
+        try:
+            values[attr] = getattr(obj, attr)
+        except AttributeError:   # unassigned slot
+            pass
+    return values
+
+
+def _property_names(cls: type) -> 'tuple[str]':
+    """Returns the non-dunder property names of a class, cached per class."""
+    cached = _PROPERTY_NAMES.get(cls)
+    if cached is None:
+        cached = tuple(attr for attr in dir(cls) if not attr.startswith('__')
+                       and isinstance(inspect.getattr_static(cls, attr, None),
+                                      property))
+        _PROPERTY_NAMES[cls] = cached
+    return cached
+
+
+@lru_cache(maxsize=256)
+def _slot_names(cls: type) -> 'tuple[str]':
+    """Returns the (non-dunder) slot names declared across a class MRO."""
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(slot for slot in slots
+                     if not slot.startswith('__') and slot not in names)
+    return tuple(names)
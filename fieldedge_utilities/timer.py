@@ -3,7 +3,7 @@
 """
 import logging
 import threading
-from time import time
+from time import monotonic
 from typing import Callable
 
 from .logger import verbose_logging
@@ -17,21 +17,26 @@ class RepeatingTimer(threading.Thread):
     Embedded tasks can use threading for continuous repeated operations.  A
     *RepeatingTimer* can be started, stopped, restarted and reconfigured.
 
-    A Thread that counts down seconds using sleep increments, then calls back 
-    to a function with any provided arguments.
+    A Thread that waits for the interval to expire, then calls back to a
+    function with any provided arguments.
     Optional auto_start feature starts the thread and the timer, in this case 
     the user doesn't need to explicitly start() then start_timer().
 
     Attributes:
         name (str): An optional descriptive name for the Thread.
         interval (int): Repeating timer interval in seconds (0=disabled).
-        sleep_chunk (float): The fraction of seconds between processing ticks.
+        sleep_chunk (float): The fraction of seconds between verbose debug
+            countdown ticks.
         max_drift (int): Delay allowed to impact the next countdown after
             running the target function.
         defer (bool): Waits until the first interval before triggering the
             target function (default = True)
 
     """
+    __slots__ = ('_interval', 'target', 'args', 'kwargs', '_sleep_chunk',
+                 'defer', '_terminate_event', '_start_event', '_reset_event',
+                 '_timesync', '_max_drift')
+
     def __init__(self,
                  seconds: int,
                  target: Callable,
@@ -52,7 +57,7 @@ class RepeatingTimer(threading.Thread):
             args: Positional arguments required by the target.
             kwargs: Optional keyword arguments to pass into the target.
             name: Optional thread name.
-            sleep_chunk: Tick seconds between expiry checks.
+            sleep_chunk: Tick seconds between verbose countdown checks.
             max_drift: Number of seconds delay from function call, to tolerate.
             auto_start: Starts the thread and timer when created.
             defer: Set if first target waits for timer expiry.
@@ -61,9 +66,6 @@ class RepeatingTimer(threading.Thread):
         Raises:
             ValueError if seconds is not an integer.
         """
-        if not (isinstance(seconds, int) and seconds >= 0):
-            err_str = 'RepeatingTimer seconds must be integer >= 0'
-            raise ValueError(err_str)
         super().__init__(daemon=daemon)
         self.name = name or f'{target.__name__}_timer_thread'
         self._interval: int = 0
@@ -78,8 +80,7 @@ class RepeatingTimer(threading.Thread):
         self._terminate_event = threading.Event()
         self._start_event = threading.Event()
         self._reset_event = threading.Event()
-        self._count = self.interval / self.sleep_chunk
-        self._timesync: int = None
+        self._timesync: float = None
         self._max_drift = None
         self.max_drift = max_drift
         if auto_start:
@@ -92,8 +93,8 @@ class RepeatingTimer(threading.Thread):
 
     @interval.setter
     def interval(self, val: int):
-        if val is None or not isinstance(val, int) or val < 0:
-            raise ValueError('Interval must be a positive integer or zero')
+        if not isinstance(val, int) or val < 0:
+            raise ValueError('RepeatingTimer seconds must be integer >= 0')
         self._interval = val
 
     @property
@@ -102,7 +103,10 @@ class RepeatingTimer(threading.Thread):
 
     @sleep_chunk.setter
     def sleep_chunk(self, value: float):
-        if 1 % value != 0:
+        if not isinstance(value, (int, float)) or not 0 < value <= 1:
+            raise ValueError('sleep_chunk must evenly divide 1 second')
+        inverse = 1 / value
+        if abs(inverse - round(inverse)) > 1e-9:
             raise ValueError('sleep_chunk must evenly divide 1 second')
         self._sleep_chunk = value
 
@@ -125,7 +129,7 @@ class RepeatingTimer(threading.Thread):
     def _resync(self) -> int:
         """Used to adjust the next countdown to account for drift."""
         if self.max_drift is not None:
-            drift = (int(time()) - self._timesync) % self.interval
+            drift = int(monotonic() - self._timesync) % self.interval
             if drift > self.max_drift:
                 _log.debug('Compensating for drift of %d seconds', drift)
                 return drift
@@ -134,38 +138,55 @@ class RepeatingTimer(threading.Thread):
     def run(self):
         """*Note: runs automatically, not meant to be called explicitly.*
         
-        Counts down the interval, checking every ``sleep_chunk`` for expiry.
+        Waits until the interval deadline unless reset, stopped or terminated.
+        If verbose logging is enabled, a countdown is logged every second using
+        ``sleep_chunk`` wakeups.
         """
-        while not self._terminate_event.is_set():
-            while (self._count > 0
-                   and self._start_event.is_set()
-                   and self.interval > 0):
+        terminated = self._terminate_event.is_set
+        started = self._start_event.is_set
+        reset_wait = self._reset_event.wait
+        reset_clear = self._reset_event.clear
+        deadline = None
+        logged = None
+        while not terminated():
+            interval = self.interval
+            if not started() or interval <= 0:
+                # stopped -> sleep until started, reset or terminated
+                reset_wait()
+                reset_clear()
+                deadline = None
+                continue
+            if deadline is None:
+                deadline = monotonic() + interval
+                logged = None
+            remaining = deadline - monotonic()
+            if remaining > 0:
+                timeout = remaining
                 if _vlog():
-                    if (self._count * self.sleep_chunk
-                        - int(self._count * self.sleep_chunk)
-                        <= 0.0):
-                        #: log debug message at reasonable interval
+                    sleep_chunk = self._sleep_chunk
+                    timeout = min(remaining, sleep_chunk)
+                    if int(remaining) != logged:
+                        logged = int(remaining)
                         _log.debug('%s countdown: %d (%d s) @ step %0.2f',
-                                   self.name, self._count, self.interval,
-                                   self.sleep_chunk)
-                if self._reset_event.wait(self.sleep_chunk):
-                    # reset -> restart the countdown
-                    self._reset_event.clear()
-                    self._count = self.interval / self.sleep_chunk
-                self._count -= 1
-                if self._count <= 0:
-                    try:   # countdown expired, trigger function and restart
-                        self.target(*self.args, **self.kwargs)
-                        drift_adjusted = self.interval - self._resync()
-                        self._count = drift_adjusted / self.sleep_chunk
-                    except BaseException as exc:
-                        _log.error('Exception in %s: %s', self.name, exc)
-                        raise
+                                   self.name, logged, interval, sleep_chunk)
+                if reset_wait(timeout):
+                    # reset/stop/terminate -> re-evaluate the countdown
+                    reset_clear()
+                    deadline = None
+                continue
+            try:   # countdown expired, trigger function and restart
+                self.target(*self.args, **self.kwargs)
+                deadline = monotonic() + interval - self._resync()
+                logged = None
+            except BaseException as exc:
+                _log.error('Exception in %s: %s', self.name, exc)
+                raise
 
     def start_timer(self):
         """Initially start the repeating timer."""
-        self._timesync = int(time())
+        self._timesync = monotonic()
         self._start_event.set()
+        self._reset_event.set()
         if self.interval > 0:
             _log.info('%s timer started (%d s)', self.name, self.interval)
             if not self.defer:
@@ -178,17 +199,15 @@ class RepeatingTimer(threading.Thread):
     def stop_timer(self):
         """Stop the repeating timer."""
         self._start_event.clear()
+        self._reset_event.set()
         _log.info('%s timer stopped (%d s)', self.name, self.interval)
-        self._count = self.interval / self.sleep_chunk
 
     def restart_timer(self, trigger_immediate: bool = None):
         """Restart the repeating timer (after an interval change)."""
         if trigger_immediate is None:
             trigger_immediate = not self.defer
-        if self._start_event.is_set():
-            self._reset_event.set()
-        else:
-            self._start_event.set()
+        self._start_event.set()
+        self._reset_event.set()
         if self.interval > 0:
             _log.info('%s timer restarted (%d s)', self.name, self.interval)
             if trigger_immediate:
@@ -208,21 +227,17 @@ class RepeatingTimer(threading.Thread):
         """
         if trigger_immediate is None:
             trigger_immediate = not self.defer
-        if (isinstance(seconds, int) and seconds >= 0):
-            _log.info('%s timer interval changed (old: %d s new: %d s)',
-                      self.name, self.interval, seconds)
-            self.interval = seconds
-            self._count = self.interval / self.sleep_chunk
-            self.restart_timer(trigger_immediate)
-        else:
-            err_str = 'RepeatingTimer seconds must be integer >= 0'
-            _log.error(err_str)
-            raise ValueError(err_str)
+        old_interval = self.interval
+        self.interval = seconds
+        _log.info('%s timer interval changed (old: %d s new: %d s)',
+                  self.name, old_interval, seconds)
+        self.restart_timer(trigger_immediate)
 
     def terminate(self):
         """Terminate the timer. (Cannot be restarted)"""
         self.stop_timer()
         self._terminate_event.set()
+        self._reset_event.set()
         _log.info('%s timer terminated', self.name)
 
     def join(self, timeout=None):
@@ -1,9 +1,13 @@
 #!/usr/bin/python
 import os
+import shlex
+import shutil
 import subprocess
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 PORT_NUMBER = int(os.getenv('HOSTREQUEST_PORT', '8008'))
+CHUNK_SIZE = 65536
 
 
 class RequestHandler(BaseHTTPRequestHandler):
@@ -11,26 +15,47 @@ class RequestHandler(BaseHTTPRequestHandler):
         request_length = int(self.headers.get('Content-Length'))
         command = self.rfile.read(request_length).decode()
         # print(f'Request:\n{command}')
-        self.send_response(200)
-        args = command if '|' in command else command.split(' ')
         shell = '|' in command
-        result = subprocess.run(args,
-                                capture_output=True,
-                                shell=shell,
-                                check=True)
-        if result.stdout:
-            response_body = result.stdout.decode()
-        else:
-            response_body = result.stderr.decode()
-        # print(f'Response:\n{response_body}')
-        self.send_header('Content-Length', len(response_body))
-        self.send_header('Content-Type', 'text/plain')
-        self.end_headers()
-        self.wfile.write(response_body.encode())
+        try:
+            args = command if shell else shlex.split(command)
+        except ValueError as err:   # e.g. unbalanced quotes
+            response_body = str(err).encode()
+            self.send_response(400)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', len(response_body))
+            self.end_headers()
+            self.wfile.write(response_body)
+            return
+        # stderr is spooled to a file so a chatty command cannot block stdout
+        with tempfile.TemporaryFile() as stderr:
+            with subprocess.Popen(args,
+                                  stdout=subprocess.PIPE,
+                                  stderr=stderr,
+                                  shell=shell) as proc:
+                chunk = proc.stdout.read(CHUNK_SIZE)
+                streamed = bool(chunk)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain')
+                if streamed:
+                    # stream stdout, body is delimited by connection close
+                    self.end_headers()
+                    while chunk:
+                        self.wfile.write(chunk)
+                        chunk = proc.stdout.read(CHUNK_SIZE)
+                proc.wait()
+            if proc.returncode:
+                self.log_error('%r exited with code %d',
+                               command, proc.returncode)
+            if streamed:
+                return
+            self.send_header('Content-Length', os.fstat(stderr.fileno()).st_size)
+            self.end_headers()
+            stderr.seek(0)
+            shutil.copyfileobj(stderr, self.wfile)
 
 
 def main():
-    server = HTTPServer(('localhost', PORT_NUMBER), RequestHandler)
+    server = ThreadingHTTPServer(('localhost', PORT_NUMBER), RequestHandler)
     server.serve_forever()
 
 
@@ -92,3 +92,8 @@ def test_geosat(test_case, test_params):
     assert az == expected_az
     el = geo_elevation(closest.value, lat, lon)
     assert el == expected_el
+
+
+def test_geo_closest_multiple_exclude():
+    closest = geo_closest(35.62149, 139.77630, ['APAC', 'IOE'])
+    assert closest.name == 'EMEA'
@@ -1,5 +1,8 @@
 import os
-from datetime import datetime
+import re
+import time
+from dataclasses import dataclass
+from glob import glob
 from logging import Logger
 
 import pytest
@@ -9,70 +12,93 @@ from fieldedge_utilities import hostpipe
 TIMESTAMP_FMT = os.getenv('HOSTPIPE_TS_FMT', 'YYYY-mm-ddTHH:MM:SS.SSSZ')
 COMMAND_PREFIX = f'{TIMESTAMP_FMT},[INFO],command='
 RESPONSE_PREFIX = f'{TIMESTAMP_FMT},[INFO],result='
+_ISO_FMT = '%Y-%m-%dT%H:%M:%S'   # fraction appended, TIMESTAMP_FMT length
+_ISO_LEN = len(TIMESTAMP_FMT) - 1
 
 TESTAPPDIR = '/home/fieldedge/fieldedge'
 LOGDIR = './tests/hostpipe_logs'
 
 MOCK_BGAN_SIM = str(os.getenv('MOCK_BGAN_SIM')).lower() == 'true'
-mock_bgan_sim_state = False
 MOCK_BIG_FILE = str(os.getenv('MOCK_BIG_FILE')).lower() == 'true'
 MOCK_NTP_ENABLED = str(os.getenv('MOCK_NTP_ENABLED')).lower() == 'true'
+_CAPTURE_ARGS = re.compile(r'-([ti])\s+(\S+)')
+_BGAN_ANY = re.compile(r'delay|enabled', re.IGNORECASE)
+_IFACE_ANY = re.compile(r'eth|en|wlan', re.IGNORECASE)
 
-def _mock_host_command(command: str, log: Logger = None) -> str:
-    """Mocks responses for testing."""
-    global mock_bgan_sim_state
-    if 'ufw status' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-ufw-status.log'
-    elif '"A POSTROUTING"' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-ufw-nat.log'
-    elif 'ip addr show' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-ipaddrshow.log'
-    elif 'grep -nr \"cache-size=\"' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-dns-get.log'
-    elif 'systemctl status chrony' in command:
-        if MOCK_NTP_ENABLED:
-            pipelog = f'{LOGDIR}/hostpipe-test-ntp-enabled.log'
-        else:
-            pipelog = f'{LOGDIR}/hostpipe-test-ntp-disabled.log'
-    elif 'grep -nr \"pool pool.ntp.org' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-ntp-get.log'
-    elif 'bgan_simulator.sh' in command:
-        if 'status' in command:
-            if MOCK_BGAN_SIM and mock_bgan_sim_state:
-                pipelog = f'{LOGDIR}/hostpipe-test-bgan-simulator-enabled.log'
-            else:
-                pipelog = f'{LOGDIR}/hostpipe-test-bgan-simulator-disabled.log'
-        elif 'enable' in command:
-            pipelog = f'{LOGDIR}/hostpipe-test-bgan-simulator-enable.log'
-            mock_bgan_sim_state = True
-        else:
-            pipelog = f'{LOGDIR}/hostpipe-test-bgan-simulator-disable.log'
-            mock_bgan_sim_state = False
-    elif 'capture.sh' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-capture.log'
-        iface = command.split('-i')[1].split(' ')[1]
-        dur = command.split('-t')[1].split(' ')[1]
-        mock_response = [
-            f'Starting wireshark capture on {iface} for {dur} seconds.',
-            f'Completed wireshark capture /home/pi/fieldedge/capture/capture_YYYYmmdd/capture_YYYYmmddTHHMMSS_{dur}',
-        ]
-        interleave_command = 'some random command'
-        interleave_response = [
-            'random response line 1',
-            'random response line 2',
-        ]
-        _mock_host_response(pipelog, command, mock_response, interleave_command, interleave_response)
-    elif 'tshark -r' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-tsharkr.log'
-        _mock_host_response(pipelog, command, [])
-    elif 'editcap' in command:
-        pipelog = f'{LOGDIR}/hostpipe-test-editcap.log'
+@dataclass
+class BganState:
+    """Mock BGAN simulator state, kept per test instead of module-global."""
+    enabled: bool = False
+
+def _mock_bgan_simulator(command: str, bgan: BganState) -> str:
+    if 'status' in command:
+        if MOCK_BGAN_SIM and bgan.enabled:
+            return f'{LOGDIR}/hostpipe-test-bgan-simulator-enabled.log'
+        return f'{LOGDIR}/hostpipe-test-bgan-simulator-disabled.log'
+    if 'enable' in command:
+        bgan.enabled = True
+        return f'{LOGDIR}/hostpipe-test-bgan-simulator-enable.log'
+    bgan.enabled = False
+    return f'{LOGDIR}/hostpipe-test-bgan-simulator-disable.log'
+
+def _mock_capture(command: str, bgan: BganState) -> str:
+    pipelog = f'{LOGDIR}/hostpipe-test-capture.log'
+    args = dict(_CAPTURE_ARGS.findall(command))
+    iface = args['i']
+    dur = args['t']
+    mock_response = [
+        f'Starting wireshark capture on {iface} for {dur} seconds.',
+        f'Completed wireshark capture /home/pi/fieldedge/capture/capture_YYYYmmdd/capture_YYYYmmddTHHMMSS_{dur}',
+    ]
+    interleave_command = 'some random command'
+    interleave_response = [
+        'random response line 1',
+        'random response line 2',
+    ]
+    _mock_host_response(pipelog, command, mock_response, interleave_command, interleave_response)
+    return pipelog
+
+def _mock_no_response(logname: str):
+    def handler(command: str, bgan: BganState) -> str:
+        pipelog = f'{LOGDIR}/{logname}'
         _mock_host_response(pipelog, command, [])
-    else:
-        pipelog = f'{LOGDIR}/hostpipe.log'
-        _mock_host_response(pipelog, command, ['test response'])
+        return pipelog
+    return handler
+
+#: (command substring, pipelog name or handler) checked in order
+_MOCK_DISPATCH = (
+    ('ufw status', 'hostpipe-test-ufw-status.log'),
+    ('"A POSTROUTING"', 'hostpipe-test-ufw-nat.log'),
+    ('ip addr show', 'hostpipe-test-ipaddrshow.log'),
+    ('grep -nr "cache-size="', 'hostpipe-test-dns-get.log'),
+    ('systemctl status chrony', 'hostpipe-test-ntp-enabled.log'
+     if MOCK_NTP_ENABLED else 'hostpipe-test-ntp-disabled.log'),
+    ('grep -nr "pool pool.ntp.org', 'hostpipe-test-ntp-get.log'),
+    ('bgan_simulator.sh', _mock_bgan_simulator),
+    ('capture.sh', _mock_capture),
+    ('tshark -r', _mock_no_response('hostpipe-test-tsharkr.log')),
+    ('editcap', _mock_no_response('hostpipe-test-editcap.log')),
+)
+
+def _mock_host_command(command: str,
+                       bgan: BganState,
+                       log: Logger = None,
+                       ) -> str:
+    """Mocks responses for testing."""
+    for match, handler in _MOCK_DISPATCH:
+        if match in command:
+            if callable(handler):
+                return handler(command, bgan)
+            return f'{LOGDIR}/{handler}'
+    pipelog = f'{LOGDIR}/hostpipe.log'
+    _mock_host_response(pipelog, command, ['test response'])
     return pipelog
 
+def _mock_iso(ts: float) -> str:
+    """Formats a unix timestamp like the hostpipe log."""
+    return (f'{time.strftime(_ISO_FMT, time.gmtime(ts))}'
+            f'.{int(ts % 1 * 1000000):06d}')[:_ISO_LEN] + 'Z'
+
 def _mock_host_response(pipelog: str,
                         command: str,
                         response: list,
@@ -81,50 +107,119 @@ def _mock_host_response(pipelog: str,
                         overwrite: bool = True,
                         ) -> None:
     """Used for test purposes only."""
-    lines_to_write = []
-    req_time = datetime.utcnow()
-    req_iso = req_time.isoformat()[0:len(TIMESTAMP_FMT) - 1] + 'Z'
-    mockcmd = (f'{COMMAND_PREFIX.replace(TIMESTAMP_FMT,req_iso)}'
-        f'{command}\n')
-    lines_to_write.append(mockcmd)
-    secs = int(req_iso[-3:-1])
-    adjust = secs + 1
-    i_req_iso = req_iso.replace(f'{secs}Z', f'{adjust}Z')
+    req_time = time.time()
+    req_iso = _mock_iso(req_time)
+    i_req_iso = _mock_iso(req_time + 0.001)
+    cmd_p = COMMAND_PREFIX.replace(TIMESTAMP_FMT, req_iso)
+    res_p = RESPONSE_PREFIX.replace(TIMESTAMP_FMT, req_iso)
+    i_cmd_p = COMMAND_PREFIX.replace(TIMESTAMP_FMT, i_req_iso)
+    i_res_p = RESPONSE_PREFIX.replace(TIMESTAMP_FMT, i_req_iso)
+    head = f'{cmd_p}{command}\n'
     if interleave_cmd is not None:
-        i_mockcmd = (f'{COMMAND_PREFIX.replace(TIMESTAMP_FMT,i_req_iso)}'
-            f'{interleave_cmd}\n')
-        lines_to_write.append(i_mockcmd)
+        head += f'{i_cmd_p}{interleave_cmd}\n'
     if interleave_res is not None:
-        for ir in interleave_res:
-            i_mockres = (f'{RESPONSE_PREFIX.replace(TIMESTAMP_FMT,i_req_iso)}'
-                f'{ir}\n')
-            lines_to_write.append(i_mockres)
-    for resline in response:
-        mockres = (f'{RESPONSE_PREFIX.replace(TIMESTAMP_FMT,req_iso)}'
-            f'{resline}\n')
-        lines_to_write.append(mockres)
-    if overwrite:
-        logfile = open(pipelog, 'w')
-    else:
-        logfile = open(pipelog, 'a')
-    logfile.writelines(lines_to_write)
-    logfile.close()
+        head += ''.join(f'{i_res_p}{ir}\n' for ir in interleave_res)
+    body = ''.join(f'{res_p}{resline}\n' for resline in response)
+    with open(pipelog, 'wb' if overwrite else 'ab') as logfile:
+        logfile.write((head + body).encode())
+
+@pytest.fixture
+def bgan_state() -> BganState:
+    """Per-test mock state, so the module can run under `pytest -n auto`."""
+    return BganState()
+
+@pytest.fixture(scope='session')
+def pipelog_fixtures() -> 'dict[str, list[str]]':
+    """Prebaked hostpipe logs read once per session."""
+    fixtures = {}
+    for pipelog in glob(f'{LOGDIR}/*.log'):
+        with open(pipelog) as file:
+            fixtures[pipelog] = file.readlines()
+    return fixtures
+
+@pytest.fixture(autouse=True)
+def in_memory_pipelog(monkeypatch, pipelog_fixtures):
+    """Serves hostpipe log reads from memory instead of the filesystem."""
+    read_pipelog = hostpipe._read_pipelog
+    def fake_read(pipelog: str) -> 'list[str]':
+        if pipelog in pipelog_fixtures:
+            return list(pipelog_fixtures[pipelog])
+        return read_pipelog(pipelog)
+    monkeypatch.setattr(hostpipe, '_read_pipelog', fake_read)
 
 def test_host_command_bgan_simulator():
     command = f'bash {TESTAPPDIR}/bgan-simulator/mimicbgan.sh status'
     pipelog = f'{LOGDIR}/hostpipe-test-bgan-simulator-enabled.log'
     res = hostpipe.host_command(command, pipelog=pipelog, test_mode=True)
     assert isinstance(res, str)
-    assert any(x in res.lower() for x in ['delay', 'enabled'])
+    assert _BGAN_ANY.search(res)
     pipelog = f'{LOGDIR}/hostpipe-test-bgan-simulator-disabled.log'
     res = hostpipe.host_command(command, pipelog=pipelog, test_mode=True)
     assert isinstance(res, str)
-    assert not any(x in res.lower() for x in ['delay', 'enabled'])
+    assert not _BGAN_ANY.search(res)
     pipelog = f'{LOGDIR}/hostpipe-test-bgan-simulator-enable.log'
     command = f'bash {TESTAPPDIR}/bgan-simulator/mimicbgan.sh enable'
     res = hostpipe.host_command(command, pipelog=pipelog, test_mode=True)
     assert 'abl' in res
 
+def test_mock_bgan_simulator_state(bgan_state: BganState):
+    command = f'bash {TESTAPPDIR}/bgan-simulator/bgan_simulator.sh'
+    status_on = 'enabled' if MOCK_BGAN_SIM else 'disabled'
+    pipelog = _mock_host_command(f'{command} status', bgan_state)
+    assert pipelog.endswith('-disabled.log')
+    pipelog = _mock_host_command(f'{command} enable', bgan_state)
+    assert bgan_state.enabled
+    assert pipelog.endswith('-enable.log')
+    pipelog = _mock_host_command(f'{command} status', bgan_state)
+    assert pipelog.endswith(f'-{status_on}.log')
+    pipelog = _mock_host_command(f'{command} disable', bgan_state)
+    assert not bgan_state.enabled
+    pipelog = _mock_host_command(f'{command} status', bgan_state)
+    assert pipelog.endswith('-disabled.log')
+
+@pytest.mark.parametrize('command,logname', [
+    ('sudo ufw status verbose', 'hostpipe-test-ufw-status.log'),
+    ('grep -nr "A POSTROUTING" /etc/ufw/before.rules',
+     'hostpipe-test-ufw-nat.log'),
+    ('ip addr show', 'hostpipe-test-ipaddrshow.log'),
+    ('grep -nr "cache-size=" /etc/dnsmasq.conf', 'hostpipe-test-dns-get.log'),
+    ('systemctl status chrony', 'hostpipe-test-ntp-enabled.log'
+     if MOCK_NTP_ENABLED else 'hostpipe-test-ntp-disabled.log'),
+    ('grep -nr "pool pool.ntp.org" /etc/chrony/chrony.conf',
+     'hostpipe-test-ntp-get.log'),
+])
+def test_mock_host_command_prebaked(bgan_state: BganState,
+                                    command: str,
+                                    logname: str):
+    assert _mock_host_command(command, bgan_state) == f'{LOGDIR}/{logname}'
+
+@pytest.mark.parametrize('command,logname,expected', [
+    (f'nohup bash {TESTAPPDIR}/capture/capture.sh -t 60 -i eth1',
+     'hostpipe-test-capture.log',
+     'Starting wireshark capture on eth1 for 60 seconds.\n'
+     'Completed wireshark capture /home/pi/fieldedge/capture/'
+     'capture_YYYYmmdd/capture_YYYYmmddTHHMMSS_60'),
+    ('tshark -r capture.pcap', 'hostpipe-test-tsharkr.log', ''),
+    ('editcap -c 100 in.pcap out.pcap', 'hostpipe-test-editcap.log', ''),
+    ('echo hello', 'hostpipe.log', 'test response'),
+])
+def test_mock_host_response(bgan_state: BganState,
+                            monkeypatch,
+                            tmp_path,
+                            command: str,
+                            logname: str,
+                            expected: str):
+    monkeypatch.setattr(f'{__name__}.LOGDIR', str(tmp_path))
+    logged_command = hostpipe._apply_preamble(command)
+    pipelog = _mock_host_command(logged_command, bgan_state)
+    assert pipelog == f'{tmp_path}/{logname}'
+    with open(pipelog) as file:
+        lines = file.readlines()
+    assert lines[0].startswith(COMMAND_PREFIX[len(TIMESTAMP_FMT):], _ISO_LEN + 1)
+    assert hostpipe._get_line_ts(lines[0]) == pytest.approx(time.time(), abs=5)
+    res = hostpipe.host_get_response(command, pipelog=pipelog, test_mode=True)
+    assert res == expected
+
 def test_host_command_manual_tshark():
     command = (f'nohup bash {TESTAPPDIR}/capture/capture.sh'
         f' -t 60 -i eth1'
@@ -145,7 +240,7 @@ def test_host_command_ip_addr_show():
     command = 'ip a show | egrep \" eth| en| wlan\"'
     pipelog = f'{LOGDIR}/hostpipe-test-ipaddrshow.log'
     res = hostpipe.host_command(command, pipelog=pipelog, test_mode=True)
-    assert any(x in res.lower() for x in ['eth', 'en', 'wlan'])
+    assert _IFACE_ANY.search(res)
 
 def test_host_command_ufw_status_verbose():
     command = 'sudo ufw status verbose'
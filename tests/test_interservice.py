@@ -58,10 +58,12 @@ def test_isc_task_queue_basic(isc_task: IscTask):
 
 
 def test_isc_task_queue_expiry(isc_task: IscTask):
-    isc_task.lifetime = 1
+    isc_task.lifetime = 0.1
     task_queue = IscTaskQueue()
     task_queue.append(isc_task)
-    while task_queue.is_queued(isc_task.uid):
-        time.sleep(1)
+    for _ in range(40):
         task_queue.remove_expired()
+        if not task_queue.is_queued(isc_task.uid):
+            break
+        time.sleep(0.05)
     assert not task_queue.is_queued(isc_task.uid)
@@ -1,6 +1,9 @@
-import json
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 import logging
-import os
 import pytest
 from time import sleep
 
@@ -8,14 +11,36 @@ from fieldedge_utilities import logger
 from fieldedge_utilities import timer
 
 TEST_STR = 'Testing basic logging functionality.'
-TEST_FILE = './logs/test.log'
+TEST_FILE = 'test.log'
+
+
+def _remove_handlers(lg: logging.Logger):
+    for h in list(lg.handlers):
+        lg.removeHandler(h)
+        h.close()
+
+
+@pytest.fixture
+def wrapping_logger():
+    """Builds the `test` wrapping logger and removes its handlers after.
 
+    Built inside the test body so handlers bind to the captured streams.
+    """
+    created = []
+    def build(**kwargs) -> logging.Logger:
+        lg = logger.get_wrapping_logger(name='test', **kwargs)
+        created.append(lg)
+        return lg
+    yield build
+    for lg in created:
+        _remove_handlers(lg)
 
-def test_stdout(capsys):
-    log = logger.get_wrapping_logger('test')
+
+def test_stdout(capfd, wrapping_logger):
+    log = wrapping_logger()
     log.info(TEST_STR)
-    captured = capsys.readouterr()
-    parts = captured.out.split(',')
+    captured = capfd.readouterr()
+    parts = captured.out.split(',', 4)
     assert len(parts) == 5
     (datetime, level, thread, module_function_line, message) = parts
     assert len(datetime) == 24
@@ -25,11 +50,11 @@ def test_stdout(capsys):
     assert message == TEST_STR + '\n'
 
 
-def test_stdout_json(capsys):
-    log = logger.get_wrapping_logger('test', format='json')
+def test_stdout_json(capfd, wrapping_logger):
+    log = wrapping_logger(format='json')
     log.info(TEST_STR)
-    captured = capsys.readouterr()
-    json_dict = json.loads(captured.out)
+    captured = capfd.readouterr()
+    json_dict = json_loads(captured.out)
     assert isinstance(json_dict['datetime'], str)
     assert len(json_dict['datetime']) == 24
     assert json_dict['level'] == 'INFO'
@@ -40,65 +65,54 @@ def test_stdout_json(capsys):
     assert json_dict['message'] == TEST_STR
 
 
-def test_stderr(capsys):
-    log = logger.get_wrapping_logger('test')
+def test_stderr(capfd, wrapping_logger):
+    log = wrapping_logger()
     log.warning(TEST_STR)
-    captured = capsys.readouterr()
+    captured = capfd.readouterr()
     assert captured.err != ''
 
 
-def create_test_file_dir(filename) -> 'str|None':
-    if not os.path.isdir(os.path.dirname(filename)):
-        newdir = os.path.dirname(TEST_FILE)
-        os.mkdir(newdir)
-        return newdir
-
-
-def test_file(capsys):
-    newdir = create_test_file_dir(TEST_FILE)
-    log = logger.get_wrapping_logger(name='test', filename=TEST_FILE)
+def test_file(capfd, wrapping_logger, tmp_path):
+    test_file = tmp_path / TEST_FILE
+    log = wrapping_logger(filename=str(test_file))
     log.info(TEST_STR)
-    captured = capsys.readouterr()
+    captured = capfd.readouterr()
     assert TEST_STR in captured.out
-    assert os.path.isfile(TEST_FILE)
-    f = open(TEST_FILE, 'r')
-    assert TEST_STR in f.readline()
-    os.remove(TEST_FILE)
-    if newdir: os.rmdir(newdir)
+    assert test_file.is_file()
+    lines = test_file.read_text().splitlines()
+    assert TEST_STR in lines[0]
 
 
-def test_exception_singleline(capsys):
-    newdir = create_test_file_dir(TEST_FILE)
-    log = logger.get_wrapping_logger(name='test', filename=TEST_FILE)
+def test_exception_singleline(capsys, wrapping_logger, tmp_path):
+    test_file = tmp_path / TEST_FILE
+    log = wrapping_logger(filename=str(test_file))
     try:
         log.info('A non-exception')
         x = 1/0
     except Exception as e:
         log.exception(e)
-    f = open(TEST_FILE, 'r')
-    assert 'ZeroDivisionError: ' in f.readlines()[1]
-    os.remove(TEST_FILE)
-    if newdir: os.rmdir(newdir)
+    lines = test_file.read_text().splitlines()
+    assert 'ZeroDivisionError: ' in lines[1]
 
 
-def test_obscured(capsys):
+def test_obscured(capfd):
     log = logger.get_fieldedge_logger(obscure=True)
     log.info('password=testPass')
-    captured = capsys.readouterr()
+    captured = capfd.readouterr()
     assert 'testPass' not in captured.out and '***' in captured.out
     log.info('password = testPass')
-    captured = capsys.readouterr()
+    captured = capfd.readouterr()
     assert 'testPass' not in captured.out and '***' in captured.out
     log.info('{ "password": "testPass", "token": "testToken" }')
-    captured = capsys.readouterr()
+    captured = capfd.readouterr()
     assert 'testPass' not in captured.out and '***' in captured.out
     assert 'testToken' not in captured.out
 
 
-def test_invalid_file_path(capsys):
+def test_invalid_file_path(capsys, wrapping_logger):
     bad_path = '/bad/path/test.log'
     with pytest.raises(FileNotFoundError, match=f'Path {bad_path} not found'):
-        log = logger.get_wrapping_logger(name='test', filename=bad_path)
+        log = wrapping_logger(filename=bad_path)
 
 
 log = logging.getLogger()
@@ -111,10 +125,9 @@ def timer_callback():
     timer_cycles += 1
 
 
-def test_library_log(capsys):
+def test_library_log(capsys, wrapping_logger, tmp_path):
     global timer_cycles
-    newdir = create_test_file_dir(TEST_FILE)
-    testlog = logger.get_wrapping_logger(name='test', filename=TEST_FILE)
+    testlog = wrapping_logger(filename=str(tmp_path / TEST_FILE))
     for h in testlog.handlers:
         logger.add_handler(log, h)
     logger.apply_formatter(log, logger.get_formatter())
@@ -124,6 +137,7 @@ def test_library_log(capsys):
     rt.start_timer()
     while timer_cycles < 2:
         sleep(1)
+    rt.terminate()
+    for h in testlog.handlers:
+        log.removeHandler(h)
     assert True
-    os.remove(TEST_FILE)
-    if newdir: os.rmdir(newdir)
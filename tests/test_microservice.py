@@ -1,14 +1,21 @@
 """Unit tests for microservices sub-package.
 """
 # import asyncio
+import json
 import logging
+import threading
 import time
 import unittest
+from collections import Counter
+from typing import ClassVar
+from unittest.mock import patch
 
 import pytest
+from paho.mqtt.client import topic_matches_sub
 
 import fieldedge_utilities  # required for mocking
 from fieldedge_utilities.microservice import *
+from fieldedge_utilities.microservice import propertycache
 from fieldedge_utilities.mqtt import MqttClient
 from fieldedge_utilities.properties import get_class_properties, get_class_tag
 
@@ -26,6 +33,7 @@ class TestService(Microservice):
         super().__init__(tag=tag or self.TAG)
         self._info_prop: str = 'test'
         self._config_prop: int = 2
+        self._isc_connected = threading.Event()
         # self.slot_config: str = 'slot_test'
 
     @property
@@ -47,26 +55,33 @@ class TestService(Microservice):
     #     await asyncio.sleep(1)
     #     return self._info_prop
 
+    def _on_isc_connect(self, *args) -> None:
+        super()._on_isc_connect(*args)
+        self._isc_connected.set()
+
     def rollcall(self):
         return super().rollcall()
 
     def rollcall_respond(self, topic: str, message: dict):
         return super().rollcall_respond(topic, message)
 
-    def on_isc_message(self, topic: str, message: dict) -> None:
-        logger.info(f'Microservice received ISC message {topic}: {message}')
+    def on_isc_message(self, topic: str, message: dict) -> bool:
+        logger.info('Microservice received ISC message %s: %s', topic, message)
+        return super().on_isc_message(topic, message)
 
     def task_progress(self, **kwargs):
-        logger.info(f'Task info: {kwargs}')
+        logger.info('Task info: %s', kwargs)
 
     def task_completed(self, **kwargs):
-        logger.info(f'Task complete: {kwargs}')
+        logger.info('Task complete: %s', kwargs)
+
+
+BASE_TOPIC = f'fieldedge/{TestService.TAG}'
+ROLLCALL_RESPONSE_TOPIC = f'{BASE_TOPIC}/rollcall/response'
 
 
 class TestFeature(Feature):
-    @property
-    def test_prop(self) -> bool:
-        return True
+    test_prop: ClassVar[bool] = True
 
     def status(self) -> dict:
         return { 'test_prop': self.test_prop }
@@ -75,7 +90,7 @@ class TestFeature(Feature):
         return ['test_prop']
 
     def on_isc_message(self, topic: str, message: dict) -> bool:
-        logger.info(f'Feature received ISC {topic}: {message}')
+        logger.info('Feature received ISC %s: %s', topic, message)
         feature_relevant = message.get('feature', None)
         if feature_relevant:
             logger.info('Feature handled')
@@ -85,7 +100,7 @@ class TestFeature(Feature):
 
 class TestProxy(MicroserviceProxy):
     def on_isc_message(self, topic: str, message: dict) -> bool:
-        logger.info(f'Proxy received ISC {topic}: {message}')
+        logger.info('Proxy received ISC %s: %s', topic, message)
         handled = super().on_isc_message(topic, message)
         if handled:
             return True
@@ -96,14 +111,48 @@ class TestProxy(MicroserviceProxy):
         return False
 
 
-@pytest.fixture
+#: Initial state of the session-scope services by fixture name.
+_snapshots: 'dict[str, dict]' = {}
+_SNAPSHOT_LISTS = ('_hidden_properties', '_hidden_isc_properties',
+                   '_rollcall_properties')
+
+
+def _snapshot(fixture_name: str, ms: TestService) -> TestService:
+    """Records the mutable state of a session-scope service as created."""
+    snapshot = {attr: list(getattr(ms, attr)) for attr in _SNAPSHOT_LISTS}
+    snapshot['_config_prop'] = ms._config_prop
+    snapshot['property_cache'] = dict(ms.property_cache._cache)
+    _snapshots[fixture_name] = snapshot
+    return ms
+
+
+def _restore(ms: TestService, snapshot: dict) -> None:
+    """Restores a session-scope service to its recorded snapshot."""
+    for attr in _SNAPSHOT_LISTS:
+        getattr(ms, attr)[:] = snapshot[attr]
+    ms._config_prop = snapshot['_config_prop']
+    ms.property_cache._cache = dict(snapshot['property_cache'])
+
+
+@pytest.fixture(scope='session')
 def test_service() -> TestService:
-    return TestService()
+    with patch(f'{Microservice.__module__}.MqttClient', StubMqtt):
+        return _snapshot('test_service', TestService())
+
+
+@pytest.fixture(autouse=True)
+def reset_session_services(request):
+    """Restores the shared session-scope services after each test."""
+    yield
+    for name, snapshot in _snapshots.items():
+        if name in request.fixturenames:
+            _restore(request.getfixturevalue(name), snapshot)
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def test_complex() -> TestService:
-    complex_ms = TestService(tag='complex')
+    with patch(f'{Microservice.__module__}.MqttClient', StubMqtt):
+        complex_ms = TestService(tag='complex')
     complex_ms.features['feature'] = TestFeature(
         task_queue=complex_ms.isc_queue,
         task_notify=complex_ms.task_progress,
@@ -117,7 +166,24 @@ def test_complex() -> TestService:
         init_callback=complex_ms_init_callback,
         # cache_lifetime=2,
     )
-    return complex_ms
+    return _snapshot('test_complex', complex_ms)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def stub_mqtt_registry():
+    """Empties the `StubMqtt` loopback registry when the module is done."""
+    yield StubMqtt._clients
+    StubMqtt._clients.clear()
+
+
+@pytest.fixture(scope='session')
+def isc_loopback(test_service: TestService,
+                 test_complex: TestService) -> 'tuple[TestService, ...]':
+    """Connects the session services over the StubMqtt loopback once."""
+    for ms in (test_service, test_complex):
+        ms._mqttc_local.connect()
+        assert ms._isc_connected.wait(5), 'Failed to connect to MQTT'
+    return test_service, test_complex
 
 
 def test_get_subclass_name(test_service: TestService):
@@ -128,69 +194,54 @@ def test_get_subclass_name(test_service: TestService):
     assert props_cls == props_inst
 
 
+EXPECTED_CONFIG_PROPS = frozenset({'log_level', 'config_prop'})
+EXPECTED_INFO_PROPS = frozenset({'tag', 'properties', 'properties_by_type',
+                                 'isc_properties', 'isc_properties_by_type',
+                                 'rollcall_properties', 'info_prop'})
+EXPECTED_PROPS = EXPECTED_CONFIG_PROPS | EXPECTED_INFO_PROPS
+EXPECTED_ISC_CONFIG_PROPS = frozenset({'logLevel', 'configProp'})
+EXPECTED_ISC_INFO_PROPS = frozenset({'infoProp'})
+EXPECTED_ISC_PROPS = EXPECTED_ISC_CONFIG_PROPS | EXPECTED_ISC_INFO_PROPS
+
+
 def test_microservice_subclass_creation(test_service: TestService):
     assert test_service.tag == TestService.TAG
-    expected_config_props = ['log_level', 'config_prop']
-    expected_info_props = ['tag', 'properties', 'properties_by_type',
-                           'isc_properties', 'isc_properties_by_type',
-                           'rollcall_properties', 'info_prop',]
-    expected_props = expected_config_props + expected_info_props
-    assert all(prop in test_service.properties for prop in expected_props)
-    assert not any(prop not in expected_props
-                   for prop in test_service.properties)
-    assert all(prop in test_service.properties_by_type['config']
-               for prop in expected_config_props)
-    assert not any(prop not in expected_config_props
-                   for prop in test_service.properties_by_type['config'])
-    assert all(prop in test_service.properties_by_type['info']
-               for prop in expected_info_props)
-    assert not any(prop not in expected_info_props
-                   for prop in test_service.properties_by_type['info'])
-    expected_isc_config_props = ['logLevel', 'configProp']
-    expected_isc_info_props = ['infoProp']
-    expected_isc_props = expected_isc_config_props + expected_isc_info_props
-    assert all(prop in test_service.isc_properties
-               for prop in expected_isc_props)
-    assert not any(prop not in expected_isc_props
-                   for prop in test_service.isc_properties)
-    isc_props = test_service.isc_properties_by_type
-    assert all(prop in test_service.isc_properties_by_type['config']
-               for prop in expected_isc_config_props)
-    assert not any(prop not in expected_isc_config_props
-                   for prop in test_service.isc_properties_by_type['config'])
-    assert all(prop in test_service.isc_properties_by_type['info']
-               for prop in expected_isc_info_props)
-    assert not any(prop not in expected_isc_info_props
-                   for prop in test_service.isc_properties_by_type['info'])
+    assert frozenset(test_service.properties) == EXPECTED_PROPS
+    props_by_type = test_service.properties_by_type
+    assert frozenset(props_by_type['config']) == EXPECTED_CONFIG_PROPS
+    assert frozenset(props_by_type['info']) == EXPECTED_INFO_PROPS
+    assert frozenset(test_service.isc_properties) == EXPECTED_ISC_PROPS
+    isc_props_by_type = test_service.isc_properties_by_type
+    assert frozenset(isc_props_by_type['config']) == EXPECTED_ISC_CONFIG_PROPS
+    assert frozenset(isc_props_by_type['info']) == EXPECTED_ISC_INFO_PROPS
     assert test_service.log_level == (
         logging.getLevelName(logger.getEffectiveLevel()))
 
 
-def test_ms_property_hide(test_service: TestService):
-    test_prop = 'config_prop'
-    expected_props = ['tag', 'log_level', 'properties', 'properties_by_type',
-                      'isc_properties', 'isc_properties_by_type', test_prop]
-    assert all(prop in test_service.properties for prop in expected_props)
-    test_service.property_hide(test_prop)
-    expected_props.remove(test_prop)
-    assert not any(prop not in test_service.properties for prop in expected_props)
-    test_service.property_unhide(test_prop)
-    expected_props.append(test_prop)
-    assert all(prop in test_service.properties for prop in expected_props)
-
-
-def test_ms_isc_property_hide(test_service: TestService):
-    test_isc_prop = 'infoProp'
-    test_prop = 'info_prop'
-    expected_isc_props = ['logLevel', 'configProp', test_isc_prop]
-    assert all(prop in test_service.isc_properties for prop in expected_isc_props)
-    test_service.isc_property_hide(test_isc_prop)
-    expected_isc_props.remove(test_isc_prop)
-    assert not any(prop not in test_service.isc_properties for prop in expected_isc_props)
-    assert test_prop in test_service.properties
-    test_service.isc_property_unhide(test_isc_prop)
-    expected_isc_props.append(test_isc_prop)
-    assert all(prop in test_service.isc_properties for prop in expected_isc_props)
+@pytest.mark.parametrize(
+    'hide,unhide,listing,name,category,py_name,py_listed', [
+        ('property_hide', 'property_unhide', 'properties',
+         'config_prop', 'config', 'config_prop', False),
+        ('isc_property_hide', 'isc_property_unhide', 'isc_properties',
+         'infoProp', 'info', 'info_prop', True),
+    ])
+def test_ms_hide_roundtrip(test_service: TestService,
+                           hide: str,
+                           unhide: str,
+                           listing: str,
+                           name: str,
+                           category: str,
+                           py_name: str,
+                           py_listed: bool):
+    expected = frozenset(getattr(test_service, listing))
+    assert name in expected
+    getattr(test_service, hide)(name)
+    assert frozenset(getattr(test_service, listing)) == expected - {name}
+    by_type = getattr(test_service, f'{listing}_by_type')
+    assert name not in by_type.get(category, [])
+    assert (py_name in test_service.properties) == py_listed
+    getattr(test_service, unhide)(name)
+    assert frozenset(getattr(test_service, listing)) == expected
 
 
 def test_ms_isc_get_property(test_service: TestService):
@@ -216,81 +267,142 @@ def test_ms_isc_set_property(test_service: TestService):
     assert getattr(test_service, test_prop) == test_val
 
 
-def test_ms_on_isc_message_self_rollcall(test_service: TestService, mocker):
+def test_ms_on_isc_message_self_rollcall(test_service: TestService,
+                                        monkeypatch):
+    published = []
     def mock_isc(message, **kwargs):
-        topic = f'fieldedge/{TestService.TAG}'
-        if 'subtopic' in kwargs:
-            topic += f'/{kwargs["subtopic"]}'
-        logger.info(f'Mocking ISC {topic}: {message}')
-        if 'subtopic' in kwargs:
-            if kwargs['subtopic'] == 'rollcall':
-                test_service._on_isc_message(topic, message)
-                assert True
-            else:
-                logger.warning('Unexpected chained response')
-                assert False
-    mocker.patch('fieldedge_utilities.microservice.Microservice.notify',
-                 side_effect=mock_isc)
+        topic = (f'{BASE_TOPIC}/{kwargs["subtopic"]}' if 'subtopic' in kwargs
+                 else BASE_TOPIC)
+        logger.info('Mocking ISC %s: %s', topic, message)
+        published.append(topic)
+        if kwargs.get('subtopic') == 'rollcall':
+            assert test_service.on_isc_message(topic, message)
+    monkeypatch.setattr(test_service, 'notify', mock_isc)
     test_service.rollcall()
+    # the service ignores its own rollcall rather than responding to it
+    assert published == [f'{BASE_TOPIC}/rollcall']
 
 
-def test_ms_on_isc_message_other_rollcall(test_service: TestService, mocker):
+def test_ms_on_isc_message_other_rollcall(test_service: TestService,
+                                         monkeypatch):
+    published = []
     def mock_isc(message, **kwargs):
-        topic = f'fieldedge/{TestService.TAG}/{kwargs.get("subtopic", None)}'
-        logger.info(f'Mocking ISC {topic}: {message}')
-        assert 'subtopic' in kwargs and kwargs['subtopic'] == 'rollcall/response'
-        assert 'uid' in message and message['uid'] == 'requestor-uuid'
-        assert 'infoProp' in message and message['infoProp'] == 'test'
-    mocker.patch('fieldedge_utilities.microservice.Microservice.notify',
-                 side_effect=mock_isc)
+        topic = f'{BASE_TOPIC}/{kwargs.get("subtopic", None)}'
+        logger.info('Mocking ISC %s: %s', topic, message)
+        published.append((topic, message))
+    monkeypatch.setattr(test_service, 'notify', mock_isc)
     test_service.rollcall_property_add('info_prop')
     topic = 'fieldedge/otherservice/rollcall'
     message = { 'uid': 'requestor-uuid' }
-    logger.info(f'Mocking ISC {topic}: {message}')
-    test_service._on_isc_message(topic, message)
+    logger.info('Mocking ISC %s: %s', topic, message)
+    assert test_service.on_isc_message(topic, message)
+    assert len(published) == 1
+    topic, response = published[0]
+    assert topic == ROLLCALL_RESPONSE_TOPIC
+    assert 'uid' in response and response['uid'] == 'requestor-uuid'
+    assert 'infoProp' in response and response['infoProp'] == 'test'
+
+
+class FakeClock:
+    """Stands in for the `time` module to step the clocks deterministically."""
+    def __init__(self) -> None:
+        self.wall = time.time()
+        self.mono_ns = time.monotonic_ns()
+
+    def time(self) -> float:
+        return self.wall
+
+    def monotonic_ns(self) -> int:
+        return self.mono_ns
+
+    def advance(self, seconds: float) -> None:
+        self.wall += seconds
+        self.mono_ns += int(seconds * 1e9)
 
 
-def test_ms_cached_property(test_service: TestService, mocker):
+def test_ms_cached_property(test_service: TestService, monkeypatch):
     TEST_PROP = 'sub_prop'
-    ref_time = time.time()
-    cache_lifetime = 1
-    test_service.property_cache.cache('something', TEST_PROP, cache_lifetime)
-    while test_service.property_cache.get_cached(TEST_PROP):
-        time.sleep(0.5)
-    elapsed = time.time() - ref_time
-    logger.info(f'Time elapsed: {elapsed}')
-    assert elapsed >= cache_lifetime
-    assert not test_service.property_cache.get_cached(TEST_PROP)
+    clock = FakeClock()
+    monkeypatch.setattr(propertycache, 'time', clock)
+    cache = test_service.property_cache
+    cache.cache('something', TEST_PROP, 1)
+    assert cache.expiry_at(TEST_PROP) - clock.time() == pytest.approx(1, abs=1e-3)
+    clock.wall += 3600   # wall clock stepped forward, e.g. NTP sync
+    assert cache.expiry_at(TEST_PROP) - clock.time() == pytest.approx(1, abs=1e-3)
+    clock.advance(1)
+    assert cache.get_cached(TEST_PROP) == 'something'
+    clock.advance(0.001)
+    assert cache.get_cached(TEST_PROP) is None
+    assert cache.expiry_at(TEST_PROP) is None
+    cache.cache('something', TEST_PROP, None)
+    clock.advance(3600)
+    assert cache.get_cached(TEST_PROP) == 'something'
+    assert cache.expiry_at(TEST_PROP) is None
+    cache.remove(TEST_PROP)
+    assert cache.get_cached(TEST_PROP) is None
 
 
 class StubMqtt(MqttClient):
-    def __init__(self, auto_connect=False) -> None:
-        pass
-    
-    def subscribe(self, topic, qos):
-        return True
-    
-    def unsubscribe(self, topic):
-        return True
+    """In-process loopback delivering publishes to subscribed stubs."""
+
+    _clients: 'list[StubMqtt]' = []
+
+    def __init__(self, auto_connect=False, **kwargs) -> None:
+        self.on_message = kwargs.get('on_message', None)
+        self.on_connect = kwargs.get('on_connect', None)
+        self._subscriptions = {}
+        self._connected = False
+        subscribe_default = kwargs.get('subscribe_default', None) or []
+        if not isinstance(subscribe_default, list):
+            subscribe_default = [subscribe_default]
+        for topic in subscribe_default:
+            self.subscribe(topic, 0)
+        StubMqtt._clients.append(self)
+        if auto_connect:
+            self.connect()
 
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
 
-proxy_call_one_count = 0
-proxy_call_two_count = 0
+    def connect(self):
+        self._connected = True
+        for meta in self._subscriptions.values():
+            meta['mid'] = 1
+        if callable(self.on_connect):
+            self.on_connect(self, None, {}, 0)
 
+    def disconnect(self):
+        self._connected = False
 
-def proxy_call_one(topic: str, message: dict):
-    global proxy_call_one_count
-    proxy_call_one_count += 1
+    def subscribe(self, topic, qos=0):
+        self._subscriptions[topic] = {'qos': qos, 'mid': int(self._connected)}
+        return True
 
+    def unsubscribe(self, topic):
+        self._subscriptions.pop(topic, None)
+        return True
 
-def proxy_call_two(topic: str, message: dict):
-    global proxy_call_two_count
-    proxy_call_two_count += 1
+    def publish(self, topic, message, qos=1, **kwargs) -> bool:
+        payload = json.loads(json.dumps(message))
+        for client in StubMqtt._clients:
+            if not client._connected or not callable(client.on_message):
+                continue
+            if any(topic_matches_sub(sub, topic)
+                   for sub in client._subscriptions):
+                client.on_message(topic, payload)
+        return True
 
 
 def test_sub_proxy():
-    global proxy_call_one_count
-    global proxy_call_two_count
+    counts = Counter()
+
+    def proxy_call_one(topic: str, message: dict):
+        counts['one'] += 1
+
+    def proxy_call_two(topic: str, message: dict):
+        counts['two'] += 1
+
     topic = 'fieldedge/test/event/test'
     message = {}
     other_topic = 'fieldedge/other/info/stuff'
@@ -304,29 +416,52 @@ def test_sub_proxy():
         proxy.proxy_pub(topic, message)
 
     main_on_message(topic, message)
-    assert proxy_call_one_count == 1
-    assert proxy_call_two_count == 1
+    assert counts == {'one': 1, 'two': 1}
     main_on_message(other_topic, other_message)
-    assert proxy_call_one_count == 1
-    assert proxy_call_two_count == 1
+    assert counts == {'one': 1, 'two': 1}
     proxy.proxy_del('test_module', topic)
     main_on_message(topic, message)
-    assert proxy_call_one_count == 1
-    assert proxy_call_two_count == 2
+    assert counts == {'one': 1, 'two': 2}
 
 
-init_success = None
+def test_sub_proxy_wildcard():
+    received = Counter()
+
+    def proxy_call(topic: str, message: dict):
+        received[topic] += 1
+
+    proxy = SubscriptionProxy(StubMqtt())
+    proxy.proxy_add('test_module', 'fieldedge/test/event/#', proxy_call)
+    proxy.proxy_add('test_module', 'fieldedge/test/event/one', proxy_call)
+    proxy.proxy_pub('fieldedge/test/event/one', {})
+    proxy.proxy_pub('fieldedge/test/event/two', {})
+    proxy.proxy_pub('fieldedge/test/info/one', {})
+    assert received == {'fieldedge/test/event/one': 1,
+                        'fieldedge/test/event/two': 1}
+    proxy.proxy_del('test_module', 'fieldedge/test/event/#')
+    proxy.proxy_pub('fieldedge/test/event/two', {})
+    assert received['fieldedge/test/event/two'] == 1
+
+
+class InitResult:
+    """Holds the latest proxy initialization callback result."""
+    def __init__(self) -> None:
+        self.success: 'bool|None' = None
+        self.done = threading.Event()
+
+
+init_result = InitResult()
 
 
 def complex_ms_init_callback(success: bool, tag: str):
-    global init_success
-    init_success = success
-    logger.info(f'Initialization of {tag} success = {success}')
+    init_result.success = success
+    init_result.done.set()
+    logger.info('Initialization of %s success = %s', tag, success)
 
 
-def test_complex_ms(test_complex: TestService, test_service: TestService):
-    """Requires live connection to a MQTT broker."""
-    global init_success
+def test_complex_ms(isc_loopback: 'tuple[TestService, ...]'):
+    """Runs over the in-process StubMqtt loopback."""
+    test_service, test_complex = isc_loopback
     assert isinstance(test_complex.features, dict) and test_complex.features
     assert 'feature' in test_complex.features
     feature = test_complex.features.get('feature')
@@ -336,41 +471,29 @@ def test_complex_ms(test_complex: TestService, test_service: TestService):
     assert 'feature_test_prop' in complex_props
     complex_isc_props = test_complex.isc_properties
     assert 'featureTestProp' in complex_isc_props
-    test_service._mqttc_local.connect()
-    attempts = 0
-    while not test_service._mqttc_local.is_connected and attempts < 3:
-        attempts += 1
-        time.sleep(0.5)
-    assert test_service._mqttc_local.is_connected, 'Failed to connect to MQTT'
-    test_complex._mqttc_local.connect()
-    while not test_complex._mqttc_local.is_connected:
-        time.sleep(0.5)
     test_complex.rollcall()
-    time.sleep(0.5)
     proxy = test_complex.ms_proxies['proxy']
+    init_result.done.clear()
     proxy.initialize()
-    attempts = 0
-    while not proxy.is_initialized and attempts < 3:
-        attempts += 1
-        time.sleep(0.5)
+    assert init_result.done.wait(5)
     assert proxy.is_initialized
-    assert init_success == True
+    assert init_result.success == True
     proxy_props = proxy.properties
     assert 'configProp' in proxy_props and proxy_props['configProp'] == 2
     assert 'infoProp' in proxy_props and proxy_props['infoProp'] == 'test'
-    assert 'logLevel' in proxy_props and proxy_props['logLevel'] == 'DEBUG'
+    assert ('logLevel' in proxy_props and
+            proxy_props['logLevel'] == test_service.log_level)
     assert proxy.property_get('configProp') == 2
     proxy.property_set('configProp', 3)
-    attempts = 0
-    while not proxy.property_get('configProp') == 3 and attempts < 3:
-        attempts += 1
-        time.sleep(0.5)
+    deadline = time.monotonic() + 1.5
+    while (not proxy.property_get('configProp') == 3 and
+           time.monotonic() < deadline):
+        time.sleep(0.01)
     assert proxy.property_get('configProp') == 3
 
 
 def mtest_proxy_init_fail(test_complex: TestService):
     """Requires live connection to a MQTT broker."""
-    global init_success
     timeout = 2
     proxy = test_complex.ms_proxies['proxy']
     proxy._init_timeout = timeout
@@ -381,7 +504,7 @@ def mtest_proxy_init_fail(test_complex: TestService):
         assert isinstance(proxy.properties, dict)
     proxy.initialize()
     time.sleep(timeout + 1)
-    assert init_success == False
+    assert init_result.success == False
 
 
 def event_callback(*args, **kwargs):
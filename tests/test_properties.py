@@ -1,15 +1,21 @@
 """Test cases for microservices.properties.
 """
+import gc
 import json
 import time
+import weakref
+from dataclasses import dataclass, field
 from enum import IntEnum
 
 import pytest
 
+from fieldedge_utilities import properties
 from fieldedge_utilities.properties import *
 
 
 class TestNestedObj:
+    __slots__ = ('one', 'two')
+
     def __init__(self) -> None:
         self.one = 1
         self.two = ['element']
@@ -44,7 +50,7 @@ class TestObj:
 
     @six.setter
     def six(self, value: int):
-        if not isinstance(value, int) or value not in range(1, 5):
+        if not isinstance(value, int) or not 1 <= value < 5:
             raise ValueError('Invalid value')
         self._six = value
 
@@ -65,9 +71,13 @@ class TestObjToo:
     
     For example a satellite monitor service could be proxied as a child through
     an IoT demo service.
+    
+    Deliberately without `__slots__` so instance attributes differ from the
+    class properties.
     """
     def __init__(self, one: str) -> None:
         self._one: str = None
+        self._one_bytes: bytes = b''
         self.one = one
         self.two: int = 2
 
@@ -78,14 +88,14 @@ class TestObjToo:
     @one.setter
     def one(self, value: str):
         try:
-            bytes.fromhex(value)
+            self._one_bytes = bytes.fromhex(value)
             self._one = value
-        except Exception as exc:
+        except (TypeError, ValueError) as exc:
             raise ValueError('value must be a hex string') from exc
 
     @property
     def one_bytes(self) -> bytearray:
-        return bytearray(bytes.fromhex(self._one))
+        return bytearray(self._one_bytes)
 
 
 def test_snake_case():
@@ -110,6 +120,8 @@ def test_camel_case():
     pascal = 'TestString'
     assert camel_case(snake) == camel
     assert camel_case(camel) == camel
+    assert camel_case('test') == 'test'
+    assert camel_case('test2') == 'test2'
     assert camel_case(capital) == camel
     assert camel_case(capital, True) == capital
     assert camel_case(pascal) == camel
@@ -188,8 +200,7 @@ def test_get_class_properties_basic():
     props = get_class_properties(TestObj)
     expected = ['two', 'three', 'four', 'five', 'six', 'seven', 'one_plus_six']
     assert isinstance(props, list)
-    assert all(prop in props for prop in expected)
-    assert not any(prop not in expected for prop in props)
+    assert set(props) == set(expected)
 
 
 def test_get_instance_properties_values(test_obj: TestObj):
@@ -202,8 +213,41 @@ def test_get_class_properties_ignore():
     ignore = ['seven', 'one_plus_six']
     props = get_class_properties(TestObj, ignore)
     expected = ['two', 'three', 'four', 'five', 'six']
-    assert all(prop in props for prop in expected)
-    assert not any(prop not in expected for prop in props)
+    assert set(props) == set(expected)
+
+
+def test_get_class_properties_inherited():
+    class TestObjSub(TestObj):
+        __slots__ = ()
+        @property
+        def eight(self):
+            return 8
+    class_attrs = set(vars(TestObjSub))
+    parent = get_class_properties(TestObj)
+    props = get_class_properties(TestObjSub)
+    assert set(vars(TestObjSub)) == class_attrs   # cache leaves class as-is
+    assert set(props) == set(parent) | {'eight'}
+    assert 'eight' not in get_class_properties(TestObj)
+    props.remove('eight')
+    assert 'eight' in get_class_properties(TestObjSub)
+
+
+def test_get_class_properties_enum():
+    assert get_class_properties(TestEnum) == []
+    assert {'name', 'value'} <= set(get_class_properties(TestEnum.FIRST))
+
+
+def test_get_class_properties_instance_attrs():
+    class NoSlots:
+        def __init__(self) -> None:
+            self.one = 1
+            self.two = ['element']
+    no_slots = NoSlots()
+    assert get_class_properties(NoSlots) == []
+    assert get_class_properties(no_slots) == ['one', 'two']
+    no_slots.three = 3
+    no_slots.four = len
+    assert get_class_properties(no_slots) == ['one', 'three', 'two']
 
 
 def test_tag_properties_basic():
@@ -211,31 +255,53 @@ def test_tag_properties_basic():
     ignore = ['six', 'seven']
     tagged_props = tag_class_properties(TestObj, ignore=ignore)
     expected_untagged = ['two', 'three', 'four', 'five', 'one_plus_six']
-    expected_tagged = [f'{notag_tag}{x.title().replace("_", "")}'
-                       for x in expected_untagged]
-    assert all(tp in expected_tagged for tp in tagged_props)
+    expected_tagged = frozenset(f'{notag_tag}{x.title().replace("_", "")}'
+                                for x in expected_untagged)
+    assert expected_tagged == set(tagged_props)
 
 
 def test_tag_properties_categorized():
     tagged_cat_props = tag_class_properties(TestObj, categorize=True)
-    assert all(k in tagged_cat_props for k in ['info', 'config'])
+    assert tagged_cat_props.keys() == {'info', 'config'}
     exp_ro_untagged = ['five', 'seven', 'one_plus_six']
     exp_rw_untagged = ['two', 'three', 'four', 'six']
-    for prop in exp_ro_untagged:
-        expected = tag_class_property(prop, get_class_tag(TestObj))
-        assert expected in tagged_cat_props['info']
-    for prop in exp_rw_untagged:
-        expected = tag_class_property(prop, get_class_tag(TestObj))
-        assert expected in tagged_cat_props['config']
+    tag = get_class_tag(TestObj)
+    assert set(tagged_cat_props['info']).issuperset(
+        tag_class_property(prop, tag) for prop in exp_ro_untagged)
+    assert set(tagged_cat_props['config']).issuperset(
+        tag_class_property(prop, tag) for prop in exp_rw_untagged)
 
 
 def test_tag_properties_kwargs():
     notag_tag = get_class_tag(TestObjToo)
     tagged_props = tag_class_properties(TestObjToo)
     expected_untagged = ['one', 'two', 'one_bytes']
-    expected_tagged = [f'{notag_tag}{x.title().replace("_", "")}'
-                       for x in expected_untagged]
-    assert all(tp in expected_tagged for tp in tagged_props)
+    expected_tagged = frozenset(f'{notag_tag}{x.title().replace("_", "")}'
+                                for x in expected_untagged)
+    assert set(tagged_props) <= expected_tagged
+
+
+def test_tag_properties_cached():
+    tagged_props = tag_class_properties(TestObj)
+    tagged_props.append('mutated')
+    assert 'mutated' not in tag_class_properties(TestObj)
+    tagged_cat_props = tag_class_properties(TestObj, categorize=True)
+    tagged_cat_props['info'].append('mutated')
+    assert 'mutated' not in tag_class_properties(TestObj, categorize=True)['info']
+
+
+
+def test_tag_properties_cache_weak():
+    class Transient:
+        @property
+        def one(self) -> int:
+            return 1
+    ref = weakref.ref(Transient)
+    assert tag_class_properties(Transient, ignore='one') == []
+    assert tag_class_properties(Transient) == ['transientOne']
+    del Transient
+    gc.collect()
+    assert ref() is None
 
 
 def test_untag_property():
@@ -247,6 +313,10 @@ def test_untag_property():
                                                      include_tag=True)
         assert hasattr(TestObj, untagged)
         assert derived_tag == tag
+    untag_class_property.cache_clear()
+    assert untag_class_property('testobjTwo') == 'two'
+    assert untag_class_property('testobjTwo') == 'two'
+    assert untag_class_property.cache_info().hits == 1
 
 
 def test_tag_merge(test_obj: TestObj, test_obj_too: TestObjToo):
@@ -259,9 +329,9 @@ def test_tag_merge(test_obj: TestObj, test_obj_too: TestObjToo):
     merged_cat = tag_merge(tagged_cat_1, tagged_cat_2)
     for cat, props in merged_cat.items():
         if cat in tagged_cat_1:
-            assert all(p in props for p in tagged_cat_1[cat])
+            assert set(props).issuperset(tagged_cat_1[cat])
         if cat in tagged_cat_2:
-            assert all(p in props for p in tagged_cat_2[cat])
+            assert set(props).issuperset(tagged_cat_2[cat])
 
 
 def test_json_compatible(test_obj):
@@ -285,14 +355,47 @@ def test_equivalent_attributes_nested_object():
     obj_1.two.one = 2
     assert not equivalent_attributes(obj_1, obj_2)
 
+class Watched:
+    KIND = 'base'
+
+    def __init__(self, w: int = 1) -> None:
+        self._w = w
+
+    @property
+    def w(self) -> int:
+        return self._w
+
+
+def test_equivalent_attributes_class_level():
+    class WatchedKind(Watched):
+        KIND = 'sub'
+
+    class WatchedDouble(Watched):
+        @property
+        def w(self) -> int:
+            return self._w * 2
+
+    assert equivalent_attributes(Watched(), Watched())
+    assert not equivalent_attributes(Watched(), WatchedKind())
+    assert not equivalent_attributes(Watched(), WatchedDouble())
+    assert not equivalent_attributes(Watched(1), Watched(2), exclude=['_w'])
+    assert equivalent_attributes(Watched(1), Watched(2), exclude=['_w', 'w'])
+
+
 #: More specific test cases for FieldEdge project concepts --------
 class SatModemBaseAttribute:
     """Generic base attribute for a satellite modem."""
+    __slots__ = ()
+
     def __eq__(self, __o: object) -> bool:
         return equivalent_attributes(self, __o)
 
 
 class Location(SatModemBaseAttribute):
+    __slots__ = ('timestamp', 'latitude', 'longitude', 'altitude', 'speed',
+                 'heading', 'gnss_satellites', 'pdop', 'hdop', 'vdop',
+                 'fix_type', 'fix_allowed')
+
     def __init__(self, **kwargs) -> None:
         self.timestamp: int = kwargs.get('timestamp', time.time())
         self.latitude: float = kwargs.get('latitude', 44.1)
@@ -318,6 +421,8 @@ class PdpContext:
         ip_address (str): The IPv4 address of the terminal for the context.
 
     """
+    __slots__ = ('id', 'service', 'apn', 'ip_address')
+
     def __init__(self, **kwargs) -> None:
         self.id: int = kwargs.get('id', None)
         self.service: str = kwargs.get('service', None)
@@ -326,6 +431,8 @@ class PdpContext:
 
 
 class PdpContextEquivalent:
+    __slots__ = ('id', 'service', 'apn', 'ip_address')
+
     def __init__(self, **kwargs) -> None:
         self.id: int = kwargs.get('id', None)
         self.service: str = kwargs.get('service', None)
@@ -358,4 +465,88 @@ def test_location():
     jsonable = json_compatible(location)
     assert isinstance(jsonable, dict)
     assert isinstance(json.dumps(jsonable), str)
-    
\ No newline at end of file
+    
+
+def test_json_compatible_nested_containers():
+    class Plain:
+        def __init__(self) -> None:
+            self.some_value = {'nested_key': 1}
+
+    assert json_compatible(({'a_b': 1},)) == [{'aB': 1}]
+    assert json_compatible((TestNestedObj(),)) == [{'one': 1, 'two': ['element']}]
+    raw = json_compatible({'x_y': [Plain()]}, camel_keys=False)
+    assert raw == {'x_y': [{'some_value': {'nested_key': 1}}]}
+
+
+def test_json_compatible_shared_reference():
+    nested = TestNestedObj()
+    thing = {'first': nested, 'second': [nested, nested]}
+    jsonable = json_compatible(thing)
+    assert jsonable['first'] == {'one': 1, 'two': ['element']}
+    assert jsonable['second'] == [jsonable['first'], jsonable['first']]
+    assert isinstance(json.dumps(jsonable), str)
+
+
+def test_json_compatible_deep_nesting():
+    deep = inner = {}
+    for _ in range(5000):
+        inner['nested_key'] = {}
+        inner = inner['nested_key']
+    jsonable = json_compatible(deep)
+    for _ in range(5000):
+        jsonable = jsonable['nestedKey']
+    assert jsonable == {}
+
+
+@dataclass(frozen=True)
+class FrozenFix:
+    fix_type: int = 3
+    gnss_satellites: int = 8
+
+
+@dataclass(frozen=True)
+class LabelledFix(FrozenFix):
+    label: str = field(default='', compare=False)
+
+
+def test_json_compatible_cached():
+    fix = FrozenFix()
+    cached = json_compatible_cached(fix)
+    assert cached == {'fixType': 3, 'gnssSatellites': 8}
+    cached['fixType'] = 0
+    assert json_compatible_cached(fix) == {'fixType': 3, 'gnssSatellites': 8}
+    assert json_compatible_cached(fix, camel_keys=False) == {
+        'fix_type': 3, 'gnss_satellites': 8}
+    first = LabelledFix(label='first')
+    second = LabelledFix(label='second')
+    assert first == second   # equal but distinct objects are cached apart
+    assert json_compatible_cached(first)['label'] == 'first'
+    assert json_compatible_cached(second)['label'] == 'second'
+    unhashable = {'key_a': 1}
+    assert json_compatible_cached(unhashable) == {'keyA': 1}
+    fix_id = id(fix)
+    del fix
+    gc.collect()
+    assert fix_id not in properties._JSON_CACHE
+
+
+@pytest.mark.parametrize('backend', ['json', 'orjson'])
+def test_json_bytes(test_obj: TestObj, backend: str, monkeypatch):
+    if backend == 'json':
+        monkeypatch.setattr(properties, 'orjson', None)
+    else:
+        pytest.importorskip('orjson')
+    pdp = PdpContext(id=1, service='IP', apn='www.inmarsat.com', ip_address='1.2.3.4')
+    thing = {'imsi_value': '123', 'previous': {1: pdp}, 'obj': test_obj}
+    encoded = json_bytes(thing)
+    assert isinstance(encoded, bytes)
+    assert encoded == json.dumps(json_compatible(thing),
+                                 separators=(',', ':'),
+                                 ensure_ascii=False).encode()
+    raw = json.loads(json_bytes(thing, camel_keys=False))
+    assert 'imsi_value' in raw and raw['previous']['1']['ip_address'] == '1.2.3.4'
+    edge_cases = {'not_a_number': float('nan'),
+                  'infinite': [float('inf'), -float('inf')],
+                  'big_int': 2**70}
+    assert json_bytes(edge_cases) == (b'{"notANumber":null,"infinite":[null,null],'
+                                      b'"bigInt":1180591620717411303424}')
@@ -1,19 +1,25 @@
 import logging
-from time import sleep, time
+from time import monotonic, sleep, time
+
+import pytest
 
 from fieldedge_utilities import timer
 
 call_count = 0
+call_times: 'list[float]' = []
 
 
 def trigger_function(arg = None, kwarg = None):
     global call_count
     call_count += 1
+    call_times.append(monotonic())
 
 
 def test_timer_basic():
     global call_count
-    start_time = time()
+    call_count = 0
+    call_times.clear()
+    start_time = monotonic()
     test_interval = 1
     test_cycles = 3
     auto_start = True
@@ -34,14 +40,17 @@ def test_timer_basic():
         t.start()
         t.start_timer()
     assert isinstance(t, timer.RepeatingTimer)
-    while call_count < test_cycles:
+    deadline = start_time + test_interval * (test_cycles + 1) + 1
+    while call_count < test_cycles and monotonic() < deadline:
         assert t.is_running
-        sleep(1)
-    stop_time = time()
+        sleep(0.05)
     t.stop_timer()
     assert call_count == test_cycles
-    run_time = int(stop_time - start_time)
-    assert run_time == test_interval * test_cycles + test_interval * defer
+    tolerance = 0.2
+    first_delay = call_times[0] - start_time
+    assert first_delay == pytest.approx(test_interval * defer, abs=tolerance)
+    for prev, this in zip(call_times, call_times[1:]):
+        assert this - prev == pytest.approx(test_interval, abs=tolerance)
     if not daemon:
         t.terminate()
 
@@ -69,6 +78,16 @@ def mtest_change_interval():
     assert run_time == initial_interval + new_interval * test_cycles
 
 
+def test_sleep_chunk():
+    t = timer.RepeatingTimer(seconds=1, target=trigger_function)
+    for valid in [1, 0.5, 0.25, 0.2, 0.1, 0.05, 0.01]:
+        t.sleep_chunk = valid
+        assert t.sleep_chunk == valid
+    for invalid in [0, -0.5, 0.3, 1.5, None]:
+        with pytest.raises(ValueError):
+            t.sleep_chunk = invalid
+
+
 def sim_delay(delay: int = 3):
     global call_count
     log = logging.getLogger()